@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for builder.py.
+
+Generates synthetic plugin repositories, serves them from a local HTTP
+server, runs builder.main() against them and reports time, throughput and
+peak RSS for each build stage (fetch, unzip, parse, classify, options, dedupe, write).
+
+    python benchmarks/bench_builder.py --repos 8 --files 200 --size 8192
+    python benchmarks/bench_builder.py --jobs 4 --warm
+
+Stage times are summed across worker threads, so with --workers > 1 they can
+add up to more than the wall time. Peak RSS is the process high-water mark
+observed when each stage finished.
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import builder  # noqa: E402
+from localserver import LocalServer  # noqa: E402
+
+WORDS = [t for tags in builder.KEYWORDS.values() for t in tags] + [
+    "plugin", "pwnagotchi", "shows", "handles", "the", "with", "for", "and", "simple", "custom"]
+
+def synthetic_plugin(rng, name, size, pattern):
+    """One plugin file; pattern picks which metadata the header carries."""
+    desc = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 14)))
+    header = []
+    if pattern in ("full", "no_author"):
+        header.append(f"__version__ = '{rng.randint(0, 3)}.{rng.randint(0, 9)}.{rng.randint(0, 20)}'")
+    if pattern == "full":
+        header.append(f"__author__ = 'dev{rng.randint(1, 50)} <dev@example.com>'")
+    if pattern in ("full", "no_author", "description_only"):
+        quote = rng.choice(['"', "'"])
+        header.append(f"__description__ = {quote}{desc}{quote}")
+    body = [
+        "import logging",
+        "import pwnagotchi.plugins as plugins",
+        "",
+        f"class {name.title().replace('_', '')}(plugins.Plugin):",
+        "    def on_loaded(self):",
+        "        self.key = self.options['api_key']",
+        "    def on_ui_update(self, ui):",
+        f"        ui.set('{name}', '{rng.choice(WORDS)}')",
+    ]
+    code = "\n".join(header + body) + "\n"
+    filler = "    # " + " ".join(rng.choice(WORDS) for _ in range(12)) + "\n"
+    while len(code) < size:
+        code += filler
+    return code
+
+def generate(directory, repos, files, size, assets_mb, seed):
+    rng = random.Random(seed)
+    patterns = ["full"] * 6 + ["no_author"] * 2 + ["description_only", "none"]
+    names = []
+    for r in range(repos):
+        archive = f"repo{r}.zip"
+        with zipfile.ZipFile(os.path.join(directory, archive), "w", zipfile.ZIP_DEFLATED) as z:
+            used = set()
+            while len(used) < files:
+                # Some names repeat across repos so dedupe has work to do
+                name = f"plugin_{rng.randint(0, repos * files // 2)}_{rng.choice(WORDS)}"
+                if name in used:
+                    continue
+                used.add(name)
+                z.writestr(f"repo{r}-main/{name}.py", synthetic_plugin(rng, name, size, rng.choice(patterns)))
+            z.writestr(f"repo{r}-main/__init__.py", "")
+            if assets_mb:
+                z.writestr(f"repo{r}-main/assets/blob.bin", rng.randbytes(assets_mb * 1024 * 1024), zipfile.ZIP_STORED)
+        names.append(archive)
+    return names
+
+def report(stats, wall, total_files):
+    print(f"\n{'STAGE':<10} | {'TIME (s)':>9} | {'CALLS':>7} | {'MB':>8} | {'FILES/S':>9} | {'MB/S':>8} | {'PEAK RSS':>9}")
+    print("-" * 80)
+    for name, entry in stats.stages.items():
+        secs = entry["seconds"]
+        mb = entry["bytes"] / 1024 / 1024
+        files_s = f"{entry['calls'] / secs:.0f}" if secs and name in ("unzip", "parse", "classify", "options") else "-"
+        mb_s = f"{mb / secs:.1f}" if secs and entry["bytes"] else "-"
+        rss = f"{entry['peak_rss_kb'] / 1024:.1f} MB" if entry["peak_rss_kb"] else "-"
+        print(f"{name:<10} | {secs:>9.3f} | {entry['calls']:>7} | {mb:>8.2f} | {files_s:>9} | {mb_s:>8} | {rss:>9}")
+    print("-" * 80)
+    print(f"Wall time {wall:.3f}s, {total_files / wall:.0f} files/s end to end\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline builder.py benchmark")
+    parser.add_argument('--repos', type=int, default=8, help='Number of synthetic repositories')
+    parser.add_argument('--files', type=int, default=100, help='Plugin files per repository')
+    parser.add_argument('--size', type=int, default=4096, help='Approximate bytes per plugin file')
+    parser.add_argument('--assets-mb', type=int, default=0, help='Incompressible asset size per repository')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--warm', action='store_true', help='Build twice and report the cached second run')
+    parser.add_argument('builder_args', nargs=argparse.REMAINDER, help='Extra builder.py arguments after --, e.g. -- --jobs 4')
+    args = parser.parse_args()
+    extra = [a for a in args.builder_args if a != "--"]
+
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        served = os.path.join(tmp, "srv")
+        os.makedirs(served)
+        archives = generate(served, args.repos, args.files, args.size, args.assets_mb, args.seed)
+
+        builder.INPUT_FILE = os.path.join(tmp, "repos.txt")
+        builder.OUTPUT_FILE = os.path.join(tmp, "plugins.json")
+        builder.SOURCE_CACHE_FILE = os.path.join(tmp, "cache", "sources.json")
+        builder.MEMBER_CACHE_FILE = os.path.join(tmp, "cache", "members.json")
+
+        with LocalServer(served) as server:
+            with open(builder.INPUT_FILE, "w") as f:
+                f.write("\n".join(server.url(a) for a in archives) + "\n")
+
+            runs = 2 if args.warm else 1
+            for run in range(runs):
+                start = time.perf_counter()
+                builder.main(extra + ([] if args.warm else ["--no-cache"]))
+                wall = time.perf_counter() - start
+            label = "warm" if args.warm else "cold"
+            print(f"\n=== {label} build: {args.repos} repos x {args.files} files (~{args.size} B each) ===")
+            report(builder.stats, wall, args.repos * args.files)
+
+if __name__ == "__main__":
+    main()
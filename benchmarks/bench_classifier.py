@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: builder.detect_category vs. the original nested-loop classifier.
+
+Runs both over the records in plugins.json (name, description and a code
+prefix synthesised from them), checks they agree on every record and prints
+the throughput of each.
+
+    python benchmarks/bench_classifier.py [--rounds 50]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import builder  # noqa: E402
+
+def legacy_detect_category(name, description, code):
+    """The classifier as it shipped before CategoryClassifier."""
+    scores = defaultdict(int)
+    name_lower = name.lower()
+    desc_lower = description.lower() if description else ""
+    code_lower = code.lower()
+
+    for category, tags in builder.KEYWORDS.items():
+        for tag in tags:
+            if tag in name_lower: scores[category] += 10
+            if re.search(r'\b' + re.escape(tag) + r'\b', desc_lower): scores[category] += 3
+            if tag in code_lower[:2000]: scores[category] += 1
+
+    if "ui.set" in code_lower: scores["Display"] += 5
+    if "gpio" in code_lower: scores["Hardware"] += 2
+
+    if not scores: return "System"
+    return max(scores, key=scores.get)
+
+def load_corpus(path):
+    with open(path, "r") as f:
+        records = json.load(f)
+    corpus = []
+    for p in records:
+        code = (
+            f"__author__ = '{p['author']}'\n__version__ = '{p['version']}'\n"
+            f"__description__ = '''{p['description']}'''\n\n"
+            f"class {p['name'].title().replace('_', '')}(plugins.Plugin):\n"
+            f"    def on_ui_update(self, ui):\n        ui.set('{p['name']}', 'ok')\n"
+        )
+        corpus.append((p['name'], p['description'], code * 8))
+    return corpus
+
+def run(func, corpus, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for name, desc, code in corpus:
+            func(name, desc, code)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Category classifier micro-benchmark")
+    parser.add_argument('--registry', default=os.path.join(ROOT, "plugins.json"))
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.registry)
+    mismatches = [n for n, d, c in corpus if legacy_detect_category(n, d, c) != builder.detect_category(n, d, c)]
+    if mismatches:
+        print(f"[!] Classifiers disagree on: {', '.join(mismatches)}")
+        sys.exit(1)
+
+    total = len(corpus) * args.rounds
+    old = run(legacy_detect_category, corpus, args.rounds)
+    new = run(builder.detect_category, corpus, args.rounds)
+    print(f"{len(corpus)} records x {args.rounds} rounds, identical categories")
+    print(f"{'legacy':<10} {total / old:>10.0f} files/s")
+    print(f"{'current':<10} {total / new:>10.0f} files/s  ({old / new:.1f}x)")
+
+if __name__ == "__main__":
+    main()
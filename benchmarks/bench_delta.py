@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Checks delta registry updates against a local server.
+
+Publishes a synthetic registry with builder.py's artifact writer, lets a
+client cache it, then publishes --behind more revisions (a few records
+changed, added and removed each time) and refreshes the client. The
+client must end up with exactly the registry a full download gives, and
+the bytes served are compared with a full download. Also checks the two
+fallbacks: a chain longer than DELTA_CHAIN_MAX and a missing delta.
+
+    python benchmarks/bench_delta.py --records 2000 --behind 3
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import builder  # noqa: E402
+import pwnstore  # noqa: E402
+from bench_search import synthetic_registry  # noqa: E402
+from localserver import LocalServer  # noqa: E402
+
+def publish(site, plugins):
+    """What the nightly build does: plugins.json plus the registry/ artifacts."""
+    with open(builder.OUTPUT_FILE, "w") as f:
+        json.dump(plugins, f, indent=2)
+    return builder.write_registry_artifacts(plugins)
+
+def mutate(plugins, rng, changes):
+    plugins = [dict(p) for p in plugins]
+    for p in rng.sample(plugins, changes):
+        p['version'] = f"1.{rng.randint(1, 99)}.0"
+        p['description'] += " Updated."
+    for _ in range(max(1, changes // 4)):
+        plugins.pop(rng.randrange(len(plugins)))
+        plugins.append(dict(rng.choice(plugins), name=f"new_plugin_{rng.randrange(10 ** 9)}"))
+    return sorted(plugins, key=lambda p: p['name'].lower())
+
+def refresh(server):
+    """A client refresh; returns (plugins, bytes served, seconds)."""
+    sent = server.httpd.bytes_sent
+    start = time.perf_counter()
+    plugins = pwnstore.fetch_registry()
+    return plugins, server.httpd.bytes_sent - sent, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Delta registry update check")
+    parser.add_argument('--records', type=int, default=2000)
+    parser.add_argument('--behind', type=int, default=3, help='Revisions the client is behind')
+    parser.add_argument('--changes', type=int, default=8, help='Records changed per revision')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        site = os.path.join(tmp, "site")
+        os.makedirs(site)
+        builder.OUTPUT_FILE = os.path.join(site, "plugins.json")
+        pwnstore.CONFIG_FILE = os.path.join(tmp, "no-config.toml")
+        pwnstore.REGISTRY_CACHE_FILE = os.path.join(tmp, "cache", "registry.json")
+        pwnstore.CACHE_DIR = os.path.join(tmp, "cache")
+        pwnstore.REFRESH = True
+
+        plugins = synthetic_registry(args.records, args.seed)
+        publish(site, plugins)
+        failures = 0
+        with LocalServer(site) as server:
+            pwnstore.DEFAULT_REGISTRY = server.url("plugins.json")
+            _, full_bytes, full_secs = refresh(server)
+            print(f"Registry: {args.records} records, full download {full_bytes / 1024:.0f} KB in {full_secs * 1000:.0f} ms")
+
+            scenarios = [("delta", args.behind, None),
+                         ("chain too long", pwnstore.DELTA_CHAIN_MAX + 1, None),
+                         ("missing delta", 2, "missing")]
+            print(f"\n{'SCENARIO':<16} | {'BEHIND':>6} | {'SERVED (KB)':>11} | {'TIME (ms)':>9} | {'RESULT'}")
+            print("-" * 65)
+            for label, behind, fault in scenarios:
+                pwnstore.fetch_registry()  # client is current
+                for _ in range(behind):
+                    plugins = mutate(plugins, rng, args.changes)
+                    manifest = publish(site, plugins)
+                if fault == "missing":
+                    os.remove(os.path.join(site, "registry", "deltas", f"{manifest['revision'] - 1}.json"))
+                result, sent, secs = refresh(server)
+                with open(builder.OUTPUT_FILE) as f:
+                    identical = result == json.load(f) and pwnstore.registry_digest(result) == manifest['files']['plugins.min.json']['sha256']
+                failures += not identical
+                print(f"{label:<16} | {behind:>6} | {sent / 1024:>11.1f} | {secs * 1000:>9.1f} | {'OK' if identical else 'MISMATCH'}")
+            print("-" * 65)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
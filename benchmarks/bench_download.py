@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Checks pwnstore's resumable downloads against a local server that drops
+connections partway through responses.
+
+Each scenario stages a plugin with stage_source() while the server cuts
+the first --drops responses short: a large single-file plugin and a full
+repository archive, each from a server that honours Range (the download
+resumes) and one that doesn't (it starts over), plus a Range member
+extraction. The staged file must match the original byte for byte.
+
+    python benchmarks/bench_download.py --size-mb 4 --drops 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pwnstore  # noqa: E402
+from localserver import FlakyHandler, FlakyRangeHandler, LocalServer  # noqa: E402
+
+def build_plugin(size):
+    header = "__version__ = '1.0.0'\n__description__ = 'Download test plugin'\n"
+    line = "# padding line that makes the plugin file large enough to interrupt\n"
+    return (header + line * (size // len(line))).encode()
+
+def build_archive(path, plugin, assets_size):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as z:
+        z.writestr("repo-main/target.py", plugin)
+        z.writestr("repo-main/assets/blob.bin", os.urandom(assets_size))
+
+def stage(directory, handler, filename, plugin, drops, drop_after):
+    pwnstore.CUSTOM_PLUGIN_DIR = directory + os.sep
+    progress = pwnstore.DownloadProgress()
+    with LocalServer(directory, handler=handler) as server:
+        server.httpd.drops_left, server.httpd.drop_after = drops, drop_after
+        start = time.perf_counter()
+        pwnstore.stage_source(server.url(filename), [dict(plugin, download_url=server.url(filename))], progress)
+        elapsed = time.perf_counter() - start
+        sent, dropped = server.httpd.bytes_sent, server.httpd.drops
+    with open(pwnstore.staging_path(plugin['name']), "rb") as f:
+        content = f.read()
+    os.remove(pwnstore.staging_path(plugin['name']))
+    return content, sent, dropped, progress.resumed, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable download check")
+    parser.add_argument('--size-mb', type=int, default=4, help='Size of the single-file plugin and of the archive padding')
+    parser.add_argument('--drops', type=int, default=3, help='Responses cut short before the server behaves')
+    args = parser.parse_args()
+    pwnstore.DOWNLOAD_RETRY_DELAY = 0
+    size = args.size_mb * 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as tmp:
+        expected = build_plugin(size)
+        with open(os.path.join(tmp, "single.py"), "wb") as f:
+            f.write(expected)
+        build_archive(os.path.join(tmp, "repo.zip"), expected, size)
+        archive_size = os.path.getsize(os.path.join(tmp, "repo.zip"))
+        single = {'name': 'single', 'origin_type': 'single'}
+        member = {'name': 'target', 'origin_type': 'zip', 'path_inside_zip': 'repo-main/target.py'}
+        small = dict(member, path_inside_zip='repo-main/small.py')
+        with zipfile.ZipFile(os.path.join(tmp, "repo.zip"), "a") as z:
+            z.writestr("repo-main/small.py", expected[:4096])
+
+        # Cut each dropped response after about a third of the file, so every retry makes progress
+        scenarios = [
+            ("single, Range", FlakyRangeHandler, "single.py", single, expected, size // 3),
+            ("single, no Range", FlakyHandler, "single.py", single, expected, size // 3),
+            ("archive, no Range", FlakyHandler, "repo.zip", member, expected, archive_size // 3),
+            ("member via Range", FlakyRangeHandler, "repo.zip", small, expected[:4096], 1024),
+        ]
+        print(f"Plugin {size / 1024 / 1024:.1f} MB, archive {archive_size / 1024 / 1024:.1f} MB, {args.drops} dropped responses each\n")
+        print(f"{'SCENARIO':<18} | {'SERVED (MB)':>11} | {'DROPS':>5} | {'RESUMED':>7} | {'TIME (s)':>8} | {'RESULT'}")
+        print("-" * 70)
+        failures = 0
+        for label, handler, filename, plugin, want, drop_after in scenarios:
+            try:
+                content, sent, dropped, resumed, elapsed = stage(tmp, handler, filename, plugin, args.drops, drop_after)
+                result = "OK" if content == want else "MISMATCH"
+            except Exception as e:
+                sent = dropped = resumed = elapsed = 0
+                result = f"FAILED ({e})"
+            failures += result != "OK"
+            print(f"{label:<18} | {sent / 1024 / 1024:>11.2f} | {dropped:>5} | {resumed:>7} | {elapsed:>8.2f} | {result}")
+        print("-" * 70)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Memory ceiling check for builder.py's archive ingestion.
+
+Builds one large synthetic repository archive (a few real plugins, an
+oversized .py member that must be skipped, and --assets-mb of incompressible
+data), serves it locally and runs builder.fetch_source() on it under
+tracemalloc. Fails if the peak Python heap goes over --limit-mb, which would
+mean the archive or a member is being held in memory instead of streamed.
+
+    python benchmarks/bench_memory.py [--assets-mb 128] [--limit-mb 8]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import builder  # noqa: E402
+from localserver import LocalServer  # noqa: E402
+
+PLUGINS = 20
+
+def build_archive(path, assets_mb):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for i in range(PLUGINS):
+            z.writestr(f"repo-main/plugin_{i}.py",
+                       f"__version__ = '1.0.{i}'\n__description__ = 'GPS display plugin {i}'\n" + "# pad\n" * 2000)
+        # Over MAX_MEMBER_SIZE, so it is skipped without being read
+        z.writestr("repo-main/generated.py", "x = 1\n" * (builder.MAX_MEMBER_SIZE // 6 + 1))
+        with z.open("repo-main/assets/blob.bin", "w", force_zip64=True) as f:
+            for _ in range(assets_mb):
+                f.write(os.urandom(1024 * 1024))
+
+def main():
+    parser = argparse.ArgumentParser(description="builder.py archive memory ceiling")
+    parser.add_argument('--assets-mb', type=int, default=128, help='Incompressible data in the archive')
+    parser.add_argument('--limit-mb', type=float, default=8.0, help='Peak traced heap allowed while ingesting')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    builder.source_cache = builder.SourceCache(None)
+    builder.member_cache = builder.MemberCache(None)
+    builder.stats.reset()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_archive(os.path.join(tmp, "repo.zip"), args.assets_mb)
+        archive_mb = os.path.getsize(os.path.join(tmp, "repo.zip")) / 1024 / 1024
+        with LocalServer(tmp) as server:
+            tracemalloc.start()
+            start = time.perf_counter()
+            plugins = builder.fetch_source(server.url("repo.zip"))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    peak_mb = peak / 1024 / 1024
+    errors = builder.stats.sources[server.url("repo.zip")]["errors"]
+    print(f"Archive {archive_mb:.1f} MB, {len(plugins)}/{PLUGINS} plugins in {elapsed:.2f}s")
+    print(f"Peak traced heap {peak_mb:.2f} MB, limit {args.limit_mb:.1f} MB")
+    failed = peak_mb > args.limit_mb or len(plugins) != PLUGINS or errors
+    for e in errors:
+        print(f"[!] {e}")
+    print("FAILED" if failed else "OK")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
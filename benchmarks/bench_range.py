@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Checks pwnstore's HTTP Range extraction against a local server.
+
+Builds a repository archive padded with incompressible assets, then
+extracts one plugin from it twice: through a server that honours Range
+(only the central directory and the member are fetched) and through one
+that ignores it (pwnstore falls back to the full archive). Both results
+must match the file in the archive byte for byte. A third run replaces the
+archive after the first Range request; pwnstore must notice and take the
+plugin from a full download of the new archive.
+
+    python benchmarks/bench_range.py --assets-mb 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pwnstore  # noqa: E402
+from localserver import LocalServer, QuietHandler, RangeHandler  # noqa: E402
+
+class RegeneratedHandler(RangeHandler):
+    """Swaps in server.replacement for repo.zip once the first request is answered."""
+
+    def send_head(self):
+        result = super().send_head()
+        with self.server.lock:
+            replacement, self.server.replacement = getattr(self.server, "replacement", None), None
+        if replacement:
+            os.replace(replacement, self.translate_path(self.path))
+        return result
+
+def build_archive(path, assets_mb, version="1.0.0"):
+    plugin = (f"__version__ = '{version}'\n__description__ = 'Range test plugin'\n" +
+              "".join(f"# line {i} of padding to make deflate work\n" for i in range(2000)))
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("repo-main/README.md", "readme\n" * 100)
+        z.writestr("repo-main/target.py", plugin)
+        z.writestr("repo-main/assets/blob.bin", os.urandom(assets_mb * 1024 * 1024), zipfile.ZIP_STORED)
+        z.writestr("repo-main/other.py", plugin.replace("Range test", "Other"))
+    return plugin.encode()
+
+def extract(handler, directory, member, replacement=None):
+    pwnstore.CUSTOM_PLUGIN_DIR = directory + os.sep
+    plugin = {'name': 'target', 'origin_type': 'zip', 'path_inside_zip': member}
+    with LocalServer(directory, handler=handler) as server:
+        server.httpd.replacement = replacement
+        start = time.perf_counter()
+        pwnstore.stage_source(server.url("repo.zip"), [dict(plugin, download_url=server.url("repo.zip"))])
+        elapsed = time.perf_counter() - start
+        sent = server.httpd.bytes_sent
+    with open(pwnstore.staging_path('target'), "rb") as f:
+        content = f.read()
+    os.remove(pwnstore.staging_path('target'))
+    return content, sent, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP Range extraction check")
+    parser.add_argument('--assets-mb', type=int, default=20, help='Size of the padding asset in the archive')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        expected = build_archive(os.path.join(tmp, "repo.zip"), args.assets_mb)
+        size = os.path.getsize(os.path.join(tmp, "repo.zip"))
+        print(f"Archive: {size / 1024 / 1024:.1f} MB")
+        # Padding of a different size, so the regenerated archive is laid out differently
+        replacement = os.path.join(tmp, "regenerated.zip")
+        updated = build_archive(replacement, args.assets_mb + 1, "1.1.0")
+        for label, handler, swap, want in (("range", RangeHandler, None, expected),
+                                           ("full", QuietHandler, None, expected),
+                                           ("changed", RegeneratedHandler, replacement, updated)):
+            content, sent, elapsed = extract(handler, tmp, "repo-main/target.py", swap)
+            status = "OK" if content == want else "MISMATCH"
+            print(f"{label:<7} {sent / 1024:>10.1f} KB transferred  {elapsed * 1000:>8.1f} ms  {status}")
+            if content != want:
+                sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Search latency benchmark for `pwnstore search`.
+
+Builds synthetic registries of increasing size, then times building and
+loading the search index and running a query mix (exact word, prefix, typo,
+two words, category filter) through ranked_search(), next to the old linear
+substring scan.
+
+    python benchmarks/bench_search.py --sizes 1000 10000 50000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pwnstore  # noqa: E402
+
+WORDS = ["gps", "discord", "telegram", "display", "battery", "handshake", "deauth", "bluetooth", "backup",
+         "weather", "clock", "wardrive", "wigle", "oled", "ups", "shutdown", "crack", "pmkid", "status",
+         "webhook", "logger", "memory", "cpu", "theme", "button", "sniffer", "notify", "tracker", "update",
+         "screen", "internet", "config", "power", "location", "ssh", "eapol", "brute", "uploader", "face"]
+FILLER = ["plugin", "shows", "the", "for", "and", "with", "simple", "custom", "pwnagotchi", "on", "your", "unit"]
+CATEGORIES = ["GPS", "Social", "Display", "Attack", "Hardware", "System"]
+
+QUERIES = [
+    ("exact", "discord", None),
+    ("prefix", "blue", None),
+    ("typo", "batery", None),
+    ("swap", "hnadshake", None),
+    ("two words", "gps tracker", None),
+    ("category", "status", "Display"),
+]
+
+def synthetic_registry(size, seed):
+    rng = random.Random(seed)
+    registry = []
+    for i in range(size):
+        name = f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{i}"
+        desc = " ".join(rng.choice(WORDS + FILLER * 2) for _ in range(rng.randint(6, 18)))
+        registry.append({"name": name, "version": "1.0.0", "description": desc.capitalize() + ".",
+                         "author": f"dev{rng.randint(1, 300)}", "category": rng.choice(CATEGORIES),
+                         "origin_type": "zip", "download_url": "https://example.invalid/repo.zip",
+                         "path_inside_zip": f"repo-main/{name}.py"})
+    registry.sort(key=lambda p: p["name"].lower())
+    return registry
+
+def linear_search(registry, query):
+    """The search as it shipped before the index."""
+    query = query.lower()
+    return [p for p in registry if query in p['name'].lower() or query in p['description'].lower()]
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description="pwnstore search benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        registry = synthetic_registry(size, args.seed)
+        build_ms, index = timed(lambda: pwnstore.build_search_index(registry), 1)
+        blob = json.dumps(index, separators=(',', ':'))
+        load_ms, index = timed(lambda: json.loads(blob), args.repeat)
+        digest_ms, _ = timed(lambda: pwnstore.registry_digest(registry), args.repeat)
+
+        print(f"\n=== {size} records: index {len(blob) / 1024:.0f} KB, build {build_ms:.0f} ms (builder side), "
+              f"load {load_ms:.1f} ms, digest check {digest_ms:.1f} ms ===")
+        print(f"{'QUERY':<24} | {'RANKED (ms)':>11} | {'HITS':>6} | {'LINEAR (ms)':>11} | {'HITS':>6}")
+        print("-" * 70)
+        for label, query, category in QUERIES:
+            ranked_ms, ranked = timed(lambda: pwnstore.ranked_search(registry, index, query, category), args.repeat)
+            linear_ms, linear = timed(lambda: [p for p in linear_search(registry, query)
+                                                if not category or p['category'] == category], args.repeat)
+            print(f"{label + ': ' + query:<24} | {ranked_ms:>11.2f} | {len(ranked):>6} | {linear_ms:>11.2f} | {len(linear):>6}")
+        print("-" * 70)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Exercises `pwnstore serve` against a local stand-in registry.
+
+Publishes a synthetic registry (plugins.json plus builder.py's registry/
+artifacts) and a repository archive from a local HTTP server, starts the
+service in-process, then:
+
+  * times list/search/info over the JSON API (one keep-alive connection)
+    next to the same lookups as `pwnstore ... --offline` subprocesses;
+  * installs a plugin through POST /install;
+  * publishes a new version of it, waits for the background revalidation
+    to pick it up, and upgrades it through POST /upgrade;
+  * checks that non-JSON POSTs and foreign Host headers are refused.
+
+    python benchmarks/bench_serve.py --records 2000
+"""
+import argparse
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import builder  # noqa: E402
+import pwnstore  # noqa: E402
+from bench_search import synthetic_registry  # noqa: E402
+from localserver import LocalServer, RangeHandler  # noqa: E402
+
+PLUGIN = "serve_demo"
+
+def plugin_code(version):
+    return (f"__version__ = '{version}'\n__description__ = 'Stand-in plugin for the service benchmark'\n"
+            "class Demo:\n    def on_loaded(self):\n        self.token = self.options['api_token']\n").encode()
+
+def publish(site, base_url, records, version):
+    """Writes the archive and the registry the nightly build would publish."""
+    code = plugin_code(version)
+    with zipfile.ZipFile(os.path.join(site, "repo.zip"), "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr(f"repo-main/{PLUGIN}.py", code)
+        z.writestr("repo-main/README.md", "readme\n")
+    demo = {"name": PLUGIN, "version": version, "description": "Stand-in plugin for the service benchmark",
+            "author": "bench", "category": "System", "origin_type": "zip", "download_url": f"{base_url}/repo.zip",
+            "path_inside_zip": f"repo-main/{PLUGIN}.py", "config_params": ["api_token"],
+            "sha256": hashlib.sha256(code).hexdigest()}
+    plugins = sorted(records + [demo], key=lambda p: p["name"].lower())
+    with open(builder.OUTPUT_FILE, "w") as f:
+        json.dump(plugins, f, indent=2)
+    builder.write_registry_artifacts(plugins)
+    return plugins, code
+
+class Client:
+    def __init__(self, port):
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+
+    def call(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if body is not None:
+            headers.setdefault("Content-Type", "application/json")
+            body = json.dumps(body)
+        self.conn.request(method, path, body=body, headers=headers)
+        r = self.conn.getresponse()
+        return r.status, json.loads(r.read())
+
+def median_ms(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def start_service(revalidate):
+    service = pwnstore.StoreService()
+    service.refresh(force=True)
+    ready = threading.Event()
+    ports = []
+
+    def on_ready(port):
+        ports.append(port)
+        ready.set()
+    threading.Thread(target=lambda: asyncio.run(pwnstore.run_server(service, "127.0.0.1", 0, revalidate, on_ready)),
+                     daemon=True).start()
+    ready.wait(10)
+    return service, ports[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="pwnstore serve check")
+    parser.add_argument('--records', type=int, default=2000, help='Synthetic registry size')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--cli-repeat', type=int, default=5)
+    args = parser.parse_args()
+    checks = []
+
+    def check(label, ok):
+        checks.append(ok)
+        print(f"  {'OK  ' if ok else 'FAIL'} {label}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        site = os.path.join(tmp, "site")
+        os.makedirs(site)
+        builder.OUTPUT_FILE = os.path.join(site, "plugins.json")
+        pwnstore.CACHE_DIR = os.path.join(tmp, "cache", "pwnstore")
+        pwnstore.REGISTRY_CACHE_FILE = os.path.join(pwnstore.CACHE_DIR, "registry.json")
+        pwnstore.SEARCH_INDEX_CACHE_FILE = os.path.join(pwnstore.CACHE_DIR, "search-index.json")
+        pwnstore.CUSTOM_PLUGIN_DIR = os.path.join(tmp, "custom-plugins") + os.sep
+        pwnstore.MANIFEST_FILE = os.path.join(pwnstore.CUSTOM_PLUGIN_DIR, ".pwnstore-manifest.json")
+        pwnstore.CONFIG_FILE = os.path.join(tmp, "config.toml")
+        with open(pwnstore.CONFIG_FILE, "w") as f:
+            f.write('main.name = "bench"\n')
+        records = synthetic_registry(args.records, 1)
+
+        default_registry = pwnstore.DEFAULT_REGISTRY
+        with LocalServer(site, RangeHandler) as server:
+            pwnstore.DEFAULT_REGISTRY = server.url("plugins.json")
+            plugins, _ = publish(site, server.base_url, records, "1.0.0")
+            service, port = start_service(revalidate=1)
+            api = Client(port)
+            sample = plugins[len(plugins) // 2]["name"]
+
+            # The CLI subprocess can't be pointed at the stand-in registry, so it gets the
+            # same records as an --offline cache for its default registry URL
+            cli_env = dict(os.environ, XDG_CACHE_HOME=os.path.join(tmp, "cli-cache"), PYTHONDONTWRITEBYTECODE="1")
+            os.makedirs(os.path.join(tmp, "cli-cache", "pwnstore"))
+            with open(os.path.join(tmp, "cli-cache", "pwnstore", "registry.json"), "w") as f:
+                json.dump({"url": default_registry, "etag": None, "last_modified": None,
+                           "fetched_at": time.time(), "plugins": plugins}, f)
+
+            def cli(*argv):
+                subprocess.run([sys.executable, os.path.join(ROOT, "pwnstore.py"), *argv, "--offline"],
+                               env=cli_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+            print(f"Registry: {len(plugins)} records\n")
+            print(f"{'LOOKUP':<12} | {'API (ms)':>9} | {'CLI (ms)':>9}")
+            print("-" * 37)
+            for label, path, argv in (("list", "/plugins", ("list",)),
+                                      ("search", "/search?q=gps", ("search", "gps")),
+                                      ("info", f"/plugins/{sample}", ("info", sample))):
+                api_ms = median_ms(lambda: api.call("GET", path), args.repeat)
+                cli_ms = median_ms(lambda: cli(*argv), args.cli_repeat)
+                print(f"{label:<12} | {api_ms:>9.2f} | {cli_ms:>9.1f}")
+            print("-" * 37)
+
+            print("\nAPI checks:")
+            status, body = api.call("GET", "/search?q=serve+demo")
+            check("search finds the stand-in plugin", status == 200 and body["plugins"][0]["name"] == PLUGIN)
+            status, body = api.call("GET", "/plugins/no_such_plugin")
+            check("unknown plugin is a 404", status == 404)
+            status, _ = api.call("POST", "/install", body=None, headers={"Content-Type": "text/plain"})
+            check("non-JSON POST is refused (415)", status == 415)
+            status, _ = api.call("POST", "/upgrade", {"names": "gps_more"})
+            check("upgrade with a string for names is a 400", status == 400)
+            status, _ = api.call("GET", "/health", headers={"Host": "evil.example:80"})
+            check("foreign Host header is refused (403)", status == 403)
+
+            if os.geteuid() != 0:
+                print("  SKIP install/upgrade (run as root to exercise them)")
+            else:
+                installed_file = os.path.join(pwnstore.CUSTOM_PLUGIN_DIR, f"{PLUGIN}.py")
+                status, body = api.call("POST", "/install", {"names": [PLUGIN]})
+                with open(installed_file, "rb") as f:
+                    check("POST /install installs the plugin", status == 200 and body["ok"] and f.read() == plugin_code("1.0.0"))
+                status, body = api.call("GET", f"/plugins/{PLUGIN}")
+                check("info reports it installed", body["status"] == "installed")
+                status, body = api.call("GET", "/upgrades")
+                check("no upgrades right after install", body["updates"] == [])
+
+                publish(site, server.base_url, records, "1.1.0")
+                deadline = time.time() + 10
+                while time.time() < deadline and api.call("GET", f"/plugins/{PLUGIN}")[1]["version"] != "1.1.0":
+                    time.sleep(0.2)
+                check("background revalidation picks up the new revision",
+                      api.call("GET", f"/plugins/{PLUGIN}")[1]["version"] == "1.1.0")
+                status, body = api.call("POST", "/upgrade", {})
+                with open(installed_file, "rb") as f:
+                    check("POST /upgrade installs the new version",
+                          status == 200 and body["installed"] == [PLUGIN] and f.read() == plugin_code("1.1.0"))
+                with open(pwnstore.CONFIG_FILE) as f:
+                    check("the plugin is enabled in config.toml", f"main.plugins.{PLUGIN}.enabled = true" in f.read())
+
+    sys.exit(0 if all(checks) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the pwnstore CLI.
+
+Runs each no-network subcommand in a fresh interpreter, subtracts the bare
+interpreter start-up (`python -c pass`) and checks the result against a
+target. It also uses `python -X importtime` to list the slowest modules
+pwnstore pulls in at import time, and fails if a heavy module (requests,
+zipfile, ...) is imported before a command needs it.
+
+Target: each subcommand below should add at most --target-ms (default 60 ms)
+on top of interpreter start-up on a desktop-class machine. A Pi Zero is
+roughly 10x slower, so this keeps those commands well under a second there.
+
+    python benchmarks/bench_startup.py [--runs 5] [--target-ms 60]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "pwnstore.py")
+
+# Modules that must only be imported by the commands that need them
+HEAVY = ("requests", "urllib3", "http.client", "ssl", "concurrent.futures", "zlib", "shutil")
+
+COMMANDS = [
+    ["--help"],
+    ["list", "--offline"],
+    ["search", "gps", "--offline"],
+    ["info", "age", "--offline"],
+    ["uninstall", "not_installed_plugin"],
+]
+
+def timed_run(argv, env, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def import_profile(env):
+    """(cumulative µs for pwnstore, [(self µs, module)] sorted slowest first, imported module names)."""
+    probe = "import sys, json, pwnstore; print(json.dumps(sorted(sys.modules)))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    baseline = subprocess.run([sys.executable, "-c", "import sys, json; print(json.dumps(sorted(sys.modules)))"],
+                              env=env, capture_output=True, text=True)
+    modules = set(json.loads(proc.stdout)) - set(json.loads(baseline.stdout))
+    rows, total = [], 0
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) != 3 or not parts[0].split(":")[-1].strip().isdigit():
+            continue
+        self_us, cumulative, name = int(parts[0].split(":")[-1]), int(parts[1]), parts[2]
+        if name == "pwnstore":
+            total = cumulative
+        if name == "pwnstore" or name in modules:
+            rows.append((self_us, name))
+    return total, sorted(rows, reverse=True), modules
+
+def seed_cache(cache_home):
+    """An --offline registry cache so list/search/info run without the network."""
+    os.makedirs(os.path.join(cache_home, "pwnstore"))
+    with open(os.path.join(ROOT, "plugins.json")) as f:
+        plugins = json.load(f)
+    cache = {"url": "https://raw.githubusercontent.com/wpa-2/pwnagotchi-store/main/plugins.json",
+             "etag": None, "last_modified": None, "fetched_at": time.time(), "plugins": plugins}
+    with open(os.path.join(cache_home, "pwnstore", "registry.json"), "w") as f:
+        json.dump(cache, f)
+
+def main():
+    parser = argparse.ArgumentParser(description="pwnstore cold-start benchmark")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=60.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, XDG_CACHE_HOME=tmp, PYTHONDONTWRITEBYTECODE="1")
+        seed_cache(tmp)
+
+        total_us, rows, modules = import_profile(env)
+        heavy = sorted(m for m in modules if m in HEAVY)
+        print(f"import pwnstore: {total_us / 1000:.1f} ms cumulative")
+        for self_us, name in rows[:8]:
+            print(f"  {self_us / 1000:>7.2f} ms  {name}")
+
+        base = timed_run([sys.executable, "-c", "pass"], env, args.runs)
+        print(f"\ninterpreter start-up: {base:.1f} ms (subtracted below)\n")
+        print(f"{'COMMAND':<32} | {'ADDED (ms)':>10} | TARGET {args.target_ms:.0f} ms")
+        print("-" * 60)
+        failed = bool(heavy)
+        for cmd in COMMANDS:
+            added = timed_run([sys.executable, SCRIPT] + cmd, env, args.runs) - base
+            ok = added <= args.target_ms
+            failed |= not ok
+            print(f"{' '.join(cmd):<32} | {added:>10.1f} | {'ok' if ok else 'SLOW'}")
+        print("-" * 60)
+        if heavy:
+            print(f"[!] Imported at start-up: {', '.join(heavy)}")
+        sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Local HTTP stand-in for GitHub used by the benchmark scripts.
+
+Serves a directory over 127.0.0.1 from a background thread, so builder.py
+and pwnstore.py can be exercised without touching the network:
+
+    with LocalServer(directory) as server:
+        url = server.url("repo.zip")
+
+RangeHandler adds single-range `Range: bytes=` support (which the stdlib
+handler lacks), with an ETag and `If-Range`, so partial-download paths can
+be exercised locally. Every
+handler counts the body bytes it sends in `server.bytes_sent`.
+
+The Flaky handlers cut the connection partway through a response, for
+testing resumable downloads:
+
+    with LocalServer(directory, FlakyRangeHandler) as server:
+        server.httpd.drops_left, server.httpd.drop_after = 3, 256 * 1024
+"""
+import functools
+import os
+import re
+import threading
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def copyfile(self, source, outputfile):
+        while True:
+            chunk = source.read(64 * 1024)
+            if not chunk:
+                break
+            try:
+                outputfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                return  # client hung up, e.g. after probing for Range support
+            self.server.bytes_sent += len(chunk)
+
+class RangeHandler(QuietHandler):
+    RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+    def send_head(self):
+        match = self.RANGE_RE.match(self.headers.get("Range", ""))
+        path = self.translate_path(self.path)
+        if not match or not os.path.isfile(path):
+            return super().send_head()
+
+        st = os.stat(path)
+        size, etag = st.st_size, f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        if self.headers.get("If-Range", etag) != etag:
+            return super().send_head()  # the file changed: send all of it
+        first, last = match.groups()
+        if first:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+        elif last:
+            start, end = max(0, size - int(last)), size - 1
+        else:
+            return super().send_head()
+        if start > end or start >= size:
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        f = open(path, "rb")
+        f.seek(start)
+        self.send_response(HTTPStatus.PARTIAL_CONTENT)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", etag)
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        return _Window(f, end - start + 1)
+
+class _Window:
+    """File wrapper that stops after `length` bytes."""
+
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+class FlakyMixin:
+    """Sends only server.drop_after body bytes and hangs up, for the next
+    server.drops_left responses; later responses are complete."""
+
+    def copyfile(self, source, outputfile):
+        with self.server.lock:
+            drop = self.server.drops_left > 0
+            if drop: self.server.drops_left -= 1
+        if not drop:
+            return super().copyfile(source, outputfile)
+        budget = self.server.drop_after
+        while budget > 0:
+            chunk = source.read(min(64 * 1024, budget))
+            if not chunk:
+                break
+            try:
+                outputfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            self.server.bytes_sent += len(chunk)
+            budget -= len(chunk)
+        self.server.drops += 1
+        self.close_connection = True
+
+class FlakyHandler(FlakyMixin, QuietHandler):
+    """Drops connections and ignores Range: a retry has to start over."""
+
+class FlakyRangeHandler(FlakyMixin, RangeHandler):
+    """Drops connections but honours Range: a retry can resume."""
+
+class LocalServer:
+    def __init__(self, directory, handler=QuietHandler):
+        self.directory = directory
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=directory))
+        self.httpd.bytes_sent = 0
+        self.httpd.lock = threading.Lock()
+        self.httpd.drops_left = self.httpd.drops = 0
+        self.httpd.drop_after = 0
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -2,19 +2,205 @@
 import requests
 import json
 import re
-import io
 import zipfile
 import os
 import logging
-from collections import defaultdict
+import argparse
+import threading
+import tempfile
+import hashlib
+import inspect
+import multiprocessing
+import time
+import heapq
+import cProfile
+import pstats
+import gzip
+import ast
+from contextlib import contextmanager
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+# The client owns the formats it reads: the search index and the config key filters
+from pwnstore import build_search_index, apply_registry_delta, CONFIG_PARAM_IGNORE, is_config_param, scan_config_lines
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    import brotli  # optional: adds a .br copy of the minified registry
+except ImportError:
+    brotli = None
 
 # --- CONFIGURATION ---
 INPUT_FILE = "repos.txt"
 OUTPUT_FILE = "plugins.json"
 
+# Fetch concurrency: total download workers and simultaneous requests per host
+MAX_WORKERS = 8
+PER_HOST_LIMIT = 4
+
+# Incremental builds: per-source ETag/Last-Modified and parsed records
+CACHE_DIR = ".build-cache"
+SOURCE_CACHE_FILE = os.path.join(CACHE_DIR, "sources.json")
+MEMBER_CACHE_FILE = os.path.join(CACHE_DIR, "members.json")
+MEMBER_CACHE_MAX = 20000
+CACHE_VERSION = 1
+
+# Streaming ingestion: archives are written to a temp file on disk, members are
+# read CHUNK_SIZE at a time and anything over MAX_MEMBER_SIZE is not a plugin.
+CHUNK_SIZE = 64 * 1024
+MAX_MEMBER_SIZE = 2 * 1024 * 1024
+
+# Opt-in parallel parsing (--jobs); seconds one file may take before it's skipped
+PARSE_JOBS = 0
+PARSE_TIMEOUT = 20
+
+# Build telemetry, written next to OUTPUT_FILE
+STATS_FILE = "build-stats.json"
+PROFILE_FILE = "build-profile.prof"
+SLOWEST_FILES = 10
+
+# Compact client artifacts (minified + compressed registry, name index, category shards)
+REGISTRY_DIR = "registry"
+# Revisions back from the current one that clients can still catch up on with deltas
+DELTA_HISTORY = 30
+
 # Logging setup
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
+# --- BUILD STATS ---
+STAGES = ("fetch", "unzip", "parse", "classify", "options", "dedupe", "write")
+
+def peak_rss_kb():
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+class BuildStats:
+    """Per-stage and per-source build telemetry, summed across worker threads.
+
+    Each fetch thread registers the source it is working on with source(), so
+    stage timings recorded in that thread are also charged to the source.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.stages = {name: {"seconds": 0.0, "calls": 0, "bytes": 0, "peak_rss_kb": 0} for name in STAGES}
+        self.sources = {}
+        self.slowest = []  # min-heap of (seconds, url, filename)
+        self.local = threading.local()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    @staticmethod
+    def new_source():
+        return {
+            "status": "fetched", "bytes": 0, "download_seconds": 0.0, "members": 0,
+            "files_parsed": 0, "files_cached": 0, "plugins": 0, "parse_seconds": 0.0,
+            "seconds": 0.0, "errors": [],
+        }
+
+    @contextmanager
+    def source(self, url):
+        entry = self.new_source()
+        with self.lock:
+            self.sources[url] = entry
+        self.local.source = (url, entry)
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["seconds"] = time.perf_counter() - start
+            self.local.source = None
+
+    def current_source(self):
+        """The calling thread's source entry, or a throwaway blank entry outside source()."""
+        current = getattr(self.local, "source", None)
+        return current[1] if current else self.new_source()
+
+    def record(self, name, seconds, calls=1, nbytes=0):
+        rss = peak_rss_kb()
+        src = self.current_source()
+        with self.lock:
+            entry = self.stages[name]
+            entry["seconds"] += seconds
+            entry["calls"] += calls
+            entry["bytes"] += nbytes
+            entry["peak_rss_kb"] = max(entry["peak_rss_kb"], rss)
+            if src and name == "fetch":
+                src["download_seconds"] += seconds
+            elif src and name in ("parse", "classify"):
+                src["parse_seconds"] += seconds
+
+    def add_bytes(self, name, nbytes):
+        src = self.current_source()
+        with self.lock:
+            self.stages[name]["bytes"] += nbytes
+            if src and name == "fetch":
+                src["bytes"] += nbytes
+
+    def merge(self, stages):
+        """Folds in a snapshot taken in a parse worker process."""
+        for name, entry in stages.items():
+            if entry["calls"]:
+                self.record(name, entry["seconds"], entry["calls"], entry["bytes"])
+
+    def file_parsed(self, filename, seconds):
+        current = getattr(self.local, "source", None)
+        url, src = current if current else ("", {})
+        src["files_parsed"] = src.get("files_parsed", 0) + 1
+        with self.lock:
+            item = (seconds, url, filename)
+            if len(self.slowest) < SLOWEST_FILES:
+                heapq.heappush(self.slowest, item)
+            elif item > self.slowest[0]:
+                heapq.heapreplace(self.slowest, item)
+
+    def error(self, message):
+        src = self.current_source()
+        if src:
+            src["status"] = "error"
+            src["errors"].append(message)
+
+    def report(self, wall_seconds, **totals):
+        """The build-stats.json document."""
+        stage_totals = {name: dict(entry, seconds=round(entry["seconds"], 4)) for name, entry in self.stages.items()}
+        sources = {}
+        for url, entry in self.sources.items():
+            sources[url] = dict(entry, **{k: round(entry[k], 4) for k in ("download_seconds", "parse_seconds", "seconds")})
+        return {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "totals": dict(
+                wall_seconds=round(wall_seconds, 3),
+                sources=len(self.sources),
+                bytes_downloaded=sum(e["bytes"] for e in self.sources.values()),
+                files_parsed=sum(e["files_parsed"] for e in self.sources.values()),
+                files_cached=sum(e["files_cached"] for e in self.sources.values()),
+                errors=sum(len(e["errors"]) for e in self.sources.values()),
+                **totals),
+            "stages": stage_totals,
+            "sources": sources,
+            "slowest_files": [
+                {"url": url, "file": filename, "seconds": round(secs, 4)}
+                for secs, url, filename in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+stats = BuildStats()
+
 # --- SMART CATEGORY DICTIONARY ---
 KEYWORDS = {
     'GPS': ['gps', 'geo', 'lat', 'lon', 'location', 'map', 'coordinates', 'nmea', 'track', 'wigle', 'wardrive'],
@@ -25,55 +211,118 @@ KEYWORDS = {
     'System': ['backup', 'ssh', 'log', 'update', 'fix', 'clean', 'config', 'manage', 'util', 'internet', 'wifi', 'connection']
 }
 
+class CategoryClassifier:
+    """Built once from KEYWORDS so classifying a file compiles no regexes.
+
+    Each distinct tag is checked once per field: the name and code prefix
+    with plain substring search, the description by tokenising it once so
+    whole-word tags are a set lookup (same as `\\btag\\b`). A hit adds its
+    weight to every category listing the tag. Ties resolve exactly as the
+    old nested loops did: categories in KEYWORDS order, then code bonuses.
+    """
+
+    CODE_PREFIX = 2000
+
+    def __init__(self, keywords):
+        self.categories = list(keywords)
+        self.tag_hits = defaultdict(list)  # tag -> category indexes, one per occurrence in KEYWORDS
+        for idx, tags in enumerate(keywords.values()):
+            for tag in tags:
+                self.tag_hits[tag].append(idx)
+        self.tags = tuple(self.tag_hits)
+        self.word_tags = {t for t in self.tags if re.fullmatch(r'\w+', t)}
+        self.other_tags = {t: re.compile(r'\b' + re.escape(t) + r'\b') for t in self.tags if t not in self.word_tags}
+
+    def substrings(self, text):
+        """Tags occurring anywhere in text."""
+        return [t for t in self.tags if t in text]
+
+    def words(self, text):
+        """Set of tags occurring as whole words in text."""
+        found = self.word_tags.intersection(re.findall(r'\w+', text))
+        found.update(t for t, pattern in self.other_tags.items() if pattern.search(text))
+        return found
+
+    def classify(self, name, description, code):
+        totals = [0] * len(self.categories)
+        code_lower = code.lower()
+        for weight, tags in ((10, self.substrings(name.lower())),
+                             (3, self.words(description.lower() if description else "")),
+                             (1, self.substrings(code_lower[:self.CODE_PREFIX]))):
+            for tag in tags:
+                for idx in self.tag_hits[tag]:
+                    totals[idx] += weight
+
+        scores = {self.categories[i]: score for i, score in enumerate(totals) if score}
+        if "ui.set" in code_lower: scores["Display"] = scores.get("Display", 0) + 5
+        if "gpio" in code_lower: scores["Hardware"] = scores.get("Hardware", 0) + 2
+
+        if not scores: return "System"
+        return max(scores, key=scores.get)
+
+CLASSIFIER = CategoryClassifier(KEYWORDS)
+
 def detect_category(name, description, code):
-    scores = defaultdict(int)
-    name_lower = name.lower()
-    desc_lower = description.lower() if description else ""
-    code_lower = code.lower()
+    return CLASSIFIER.classify(name, description, code)
 
-    for category, tags in KEYWORDS.items():
-        for tag in tags:
-            if tag in name_lower: scores[category] += 10
-            if re.search(r'\b' + re.escape(tag) + r'\b', desc_lower): scores[category] += 3
-            if tag in code_lower[:2000]: scores[category] += 1
+def is_options(node, aliases):
+    if isinstance(node, ast.Name): return node.id in aliases
+    return isinstance(node, ast.Attribute) and node.attr == "options" and isinstance(node.value, ast.Name) and node.value.id == "self"
 
-    if "ui.set" in code_lower: scores["Display"] += 5
-    if "gpio" in code_lower: scores["Hardware"] += 2
+def find_config_params(code, plugin_name):
+    """Option keys a plugin reads: self.options['key'], self.options.get('key') and
+    'key' in self.options, also through a local alias (opts = self.options).
+    Files that don't parse fall back to the client's line heuristics."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return scan_config_lines(code.splitlines(), plugin_name)
 
-    if not scores: return "System"
-    return max(scores, key=scores.get)
+    aliases = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and is_options(node.value, ()):
+            aliases.update(t.id for t in node.targets if isinstance(t, ast.Name))
 
-def parse_python_content(code, filename, origin_url, internal_path=None):
+    keys = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Subscript) and is_options(node.value, aliases):
+            keys.append(node.slice)
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "get" \
+                and is_options(node.func.value, aliases) and node.args:
+            keys.append(node.args[0])
+        elif isinstance(node, ast.Compare) and len(node.ops) == 1 and isinstance(node.ops[0], (ast.In, ast.NotIn)) \
+                and is_options(node.comparators[0], aliases):
+            keys.append(node.left)
+    return sorted({k.value for k in keys if isinstance(k, ast.Constant) and isinstance(k.value, str)
+                   and is_config_param(k.value, plugin_name)})
+
+def extract_metadata(code, filename):
+    """Returns version/author/description/category for a plugin file, or None if it isn't one."""
     data = {}
     
     try:
-        # --- ROBUST REGEX FIX for Description ---
-        # Captures content between matching quotes ("..." or '...') ignoring internal apostrophes.
-        desc_match = re.search(r"__description__\s*=\s*([\"'])((?:(?!\1).)*)\1", code, re.DOTALL)
-        
-        # Check for version and author (standard regex)
-        version_match = re.search(r"__version__\s*=\s*['\"](.+?)['\"]", code)
-        author_match = re.search(r"__author__\s*=\s*['\"](.+?)['\"]", code)
+        with stats.stage("parse"):
+            # --- ROBUST REGEX FIX for Description ---
+            # Captures content between matching quotes ("..." or '...') ignoring internal apostrophes.
+            desc_match = re.search(r"__description__\s*=\s*([\"'])((?:(?!\1).)*)\1", code, re.DOTALL)
+            
+            # Check for version and author (standard regex)
+            version_match = re.search(r"__version__\s*=\s*['\"](.+?)['\"]", code)
+            author_match = re.search(r"__author__\s*=\s*['\"](.+?)['\"]", code)
 
-        data['version'] = version_match.group(1) if version_match else "0.0.1"
-        data['author'] = author_match.group(1) if author_match else "Unknown"
-        data['description'] = desc_match.group(2).strip() if desc_match else "No description provided."
+            data['version'] = version_match.group(1) if version_match else "0.0.1"
+            data['author'] = author_match.group(1) if author_match else "Unknown"
+            data['description'] = desc_match.group(2).strip() if desc_match else "No description provided."
         
         # Determine category
-        data['category'] = detect_category(filename.replace(".py", ""), data['description'], code)
+        with stats.stage("classify"):
+            data['category'] = detect_category(filename.replace(".py", ""), data['description'], code)
 
         # Only return data if we found enough metadata
         if data['description'] != "No description provided." or data['version'] != "0.0.1":
-            return {
-                "name": filename.replace(".py", ""),
-                "version": data['version'],
-                "description": data['description'],
-                "author": data['author'],
-                "category": data['category'],
-                "origin_type": "zip" if internal_path else "single",
-                "download_url": origin_url,
-                "path_inside_zip": internal_path
-            }
+            with stats.stage("options"):
+                data['config_params'] = find_config_params(code, filename.replace(".py", ""))
+            return data
         
     except Exception as e:
         # Silently fail here (pass) to prevent the build process from crashing 
@@ -82,31 +331,421 @@ def parse_python_content(code, filename, origin_url, internal_path=None):
         
     return None
 
+def make_record(data, filename, origin_url, internal_path=None):
+    return {
+        "name": filename.replace(".py", ""),
+        "version": data['version'],
+        "description": data['description'],
+        "author": data['author'],
+        "category": data['category'],
+        "origin_type": "zip" if internal_path else "single",
+        "download_url": origin_url,
+        "path_inside_zip": internal_path,
+        "config_params": data['config_params'],
+        "sha256": data.get('sha256')
+    }
+
+def parse_member(code, filename, path=None):
+    """extract_metadata() with the file's time recorded in the build stats."""
+    start = time.perf_counter()
+    data = extract_metadata(code, filename)
+    stats.file_parsed(path or filename, time.perf_counter() - start)
+    return data
+
+def parse_python_content(code, filename, origin_url, internal_path=None):
+    data = extract_metadata(code, filename)
+    if data: data['sha256'] = hashlib.sha256(code.encode('utf-8')).hexdigest()
+    return make_record(data, filename, origin_url, internal_path) if data else None
+
+_fingerprint = None
+
+def parser_fingerprint():
+    """Hash of KEYWORDS and the parser source; any edit to either invalidates the caches."""
+    global _fingerprint
+    if _fingerprint is None:
+        h = hashlib.sha256(json.dumps([KEYWORDS, CONFIG_PARAM_IGNORE], sort_keys=True).encode())
+        for func in (CategoryClassifier, detect_category, is_options, find_config_params, is_config_param,
+                     scan_config_lines, extract_metadata, make_record):
+            h.update(inspect.getsource(func).encode())
+        _fingerprint = f"{CACHE_VERSION}-{h.hexdigest()[:16]}"
+    return _fingerprint
+
+# --- HTTP SESSION ---
+_session = None
+_host_slots = {}
+_host_lock = threading.Lock()
+
+def get_session():
+    """Shared pooled session so workers reuse connections to the same host."""
+    global _session
+    # The first callers are the fetch threads; the lock keeps them on one session
+    with _host_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+def host_slot(url):
+    """Semaphore limiting how many requests run against one host at a time."""
+    host = urlparse(url).netloc
+    with _host_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        return _host_slots[host]
+
+def http_get(url, timeout, headers=None):
+    with host_slot(url), stats.stage("fetch"):
+        r = get_session().get(url, timeout=timeout, headers=headers)
+        stats.add_bytes("fetch", len(r.content))
+        return r
+
+def download_archive(url, headers=None):
+    """Streams url into a temp file. Returns (response, file), file is None on 304."""
+    with host_slot(url), stats.stage("fetch"):
+        r = get_session().get(url, timeout=30, headers=headers, stream=True)
+        try:
+            if r.status_code == 304:
+                return r, None
+            r.raise_for_status()
+            # Not SpooledTemporaryFile: before Python 3.11 it has no seekable(),
+            # which zipfile needs to read members.
+            tmp = tempfile.TemporaryFile()
+            for chunk in r.iter_content(CHUNK_SIZE):
+                tmp.write(chunk)
+                stats.add_bytes("fetch", len(chunk))
+            tmp.seek(0)
+            return r, tmp
+        finally:
+            r.close()
+
+def is_plugin_member(filename):
+    return filename.endswith(".py") and "__init__" not in filename and "/." not in filename
+
+def read_member(z, info):
+    """Reads one archive member in chunks. Returns the decoded text and the SHA-256 of its bytes."""
+    chunks = []
+    digest = hashlib.sha256()
+    with stats.stage("unzip"):
+        with z.open(info) as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk: break
+                digest.update(chunk)
+                chunks.append(chunk)
+        data = b"".join(chunks)
+        stats.add_bytes("unzip", len(data))
+        return data.decode('utf-8', errors='ignore'), digest.hexdigest()
+
+# --- BUILD CACHES ---
+class JsonCache:
+    """A dict persisted to one JSON file, discarded when the parser fingerprint changes."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == parser_fingerprint():
+                self.entries = data.get("entries", {})
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable cache {self.path}: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": parser_fingerprint(), "entries": self.entries}, f)
+        os.replace(tmp, self.path)
+
+class SourceCache(JsonCache):
+    """Each source's validators and the plugins parsed from it."""
+
+    def __init__(self, path=None):
+        super().__init__(path)
+        self.reused = 0
+        self.refetched = 0
+
+    def validators(self, url):
+        """Conditional GET headers for a previously fetched source."""
+        entry = self.entries.get(url) if self.path else None
+        headers = {}
+        if entry:
+            if entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def reuse(self, url):
+        with self.lock:
+            self.reused += 1
+            return [dict(p) for p in self.entries[url]["plugins"]]
+
+    def store(self, url, response, plugins):
+        with self.lock:
+            self.refetched += 1
+            self.entries[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "plugins": plugins,
+            }
+
+class MemberCache(JsonCache):
+    """extract_metadata() results keyed by file content (zip CRC32 + size, or SHA-256) and name."""
+
+    MISS = object()
+
+    def __init__(self, path=None):
+        super().__init__(path)
+        self.seen = set()
+        self.hits = 0
+
+    @staticmethod
+    def zip_key(info):
+        return f"crc-{info.CRC:08x}-{info.file_size}-{info.filename.split('/')[-1]}"
+
+    @staticmethod
+    def content_key(digest, filename):
+        return f"sha256-{digest}-{filename}"
+
+    def get(self, key):
+        with self.lock:
+            self.seen.add(key)
+            if key in self.entries:
+                self.hits += 1
+                return self.entries[key]
+        return self.MISS
+
+    def put(self, key, data):
+        with self.lock:
+            self.entries[key] = data
+
+    def save(self):
+        # Drop entries not used by this build once the cache grows past its cap
+        if len(self.entries) > MEMBER_CACHE_MAX:
+            self.entries = {k: v for k, v in self.entries.items() if k in self.seen}
+        super().save()
+
+source_cache = SourceCache()
+member_cache = MemberCache()
+
+# --- PARALLEL PARSING ---
+def extract_in_worker(code, filename):
+    """Pool entry point: extract_metadata() plus the worker's own stage timings."""
+    stats.reset()
+    return extract_metadata(code, filename), stats.stages
+
+class ParsePool:
+    """Process pool for extract_metadata() with a per-file time limit.
+
+    A file that runs past the limit is dropped. Its pool is retired (left to
+    finish the other jobs already queued on it) and new work goes to a fresh
+    pool; retired pools are terminated when the build ends. Replacements are
+    started with spawn, since forking from a fetch thread could copy a lock
+    another thread holds.
+    """
+
+    def __init__(self, jobs, timeout):
+        self.jobs = jobs
+        self.timeout = timeout
+        self.window = jobs * 4  # members in flight per archive, bounds memory
+        self.pool = multiprocessing.Pool(jobs)
+        self.retired = []
+        self.lock = threading.Lock()
+
+    def submit(self, code, filename):
+        with self.lock:
+            pool = self.pool
+            return pool, pool.apply_async(extract_in_worker, (code, filename))
+
+    def result(self, job, filename):
+        """Returns (metadata, ok); ok is False when the time limit was hit."""
+        pool, async_result = job
+        try:
+            data, worker_stages = async_result.get(self.timeout)
+            stats.merge(worker_stages)
+            stats.file_parsed(filename, worker_stages["parse"]["seconds"] + worker_stages["classify"]["seconds"])
+            return data, True
+        except multiprocessing.TimeoutError:
+            logging.error(f"    [!] Parse of {filename} exceeded {self.timeout}s, skipping")
+            stats.error(f"Parse of {filename} exceeded {self.timeout}s")
+            stats.file_parsed(filename, self.timeout)
+            with self.lock:
+                if pool is self.pool:
+                    self.retired.append(pool)
+                    self.pool = multiprocessing.get_context("spawn").Pool(self.jobs)
+            return None, False
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        for pool in self.retired:
+            pool.terminate()
+
+parse_pool = None
+
 def process_zip_url(url):
     found = []
     try:
         logging.info(f"[*] Downloading ZIP: {url}...")
-        r = requests.get(url, timeout=30)
-        r.raise_for_status()
-        
-        z = zipfile.ZipFile(io.BytesIO(r.content))
-        
-        for filename in z.namelist():
-            if filename.endswith(".py") and "__init__" not in filename and "/." not in filename:
-                with z.open(filename) as f:
-                    code = f.read().decode('utf-8', errors='ignore')
-                
-                # Assume any .py file that passes the filename filter is a plugin (lowering the strictness barrier)
-                plugin = parse_python_content(code, filename.split("/")[-1], url, filename)
-                if plugin:
-                    logging.info(f"    [+] {plugin['name']:<25} -> {plugin['category']}")
-                    found.append(plugin)
+        r, archive = download_archive(url, headers=source_cache.validators(url))
+        if archive is None:
+            logging.info(f"    [=] Unchanged, reusing cached results for {url}")
+            stats.current_source()["status"] = "cached"
+            return source_cache.reuse(url)
+
+        complete = True
+        pending = deque()  # (filename, cache key, sha256, job) in archive order
+
+        def collect(filename, data):
+            plugin = make_record(data, filename.split("/")[-1], url, filename) if data else None
+            if plugin:
+                logging.info(f"    [+] {plugin['name']:<25} -> {plugin['category']}")
+                found.append(plugin)
+
+        def drain(limit):
+            nonlocal complete
+            while len(pending) > limit:
+                filename, key, digest, job = pending.popleft()
+                data, ok = parse_pool.result(job, filename)
+                if data: data['sha256'] = digest
+                if ok:
+                    member_cache.put(key, data)
+                complete = complete and ok
+                collect(filename, data)
+
+        with archive, zipfile.ZipFile(archive) as z:
+            members = z.infolist()
+            stats.current_source()["members"] = len(members)
+            for info in members:
+                filename = info.filename
+                if not is_plugin_member(filename):
+                    continue
+                if info.file_size > MAX_MEMBER_SIZE:
+                    logging.warning(f"    [-] Skipping oversized {filename} ({info.file_size} bytes)")
+                    continue
+                basename = filename.split("/")[-1]
+                key = member_cache.zip_key(info)
+                data = member_cache.get(key)
+                if data is not MemberCache.MISS:
+                    drain(0)
+                    stats.current_source()["files_cached"] += 1
+                    collect(filename, data)
+                elif parse_pool:
+                    code, digest = read_member(z, info)
+                    pending.append((filename, key, digest, parse_pool.submit(code, basename)))
+                    drain(parse_pool.window)
+                else:
+                    # Assume any .py file that passes the filename filter is a plugin (lowering the strictness barrier)
+                    code, digest = read_member(z, info)
+                    data = parse_member(code, basename, filename)
+                    if data: data['sha256'] = digest
+                    member_cache.put(key, data)
+                    collect(filename, data)
+            drain(0)
+
+        # A file that hit the parse time limit is missing from this result, so
+        # don't let a 304 next time pin the incomplete list.
+        if complete:
+            source_cache.store(url, r, found)
                 
     except Exception as e:
         logging.error(f"    [!] ZIP Error for {url}: {e}")
+        stats.error(str(e))
     return found
 
-def main():
+def process_single_url(url):
+    try:
+        # Handle single raw file URL
+        r = http_get(url, timeout=15, headers=source_cache.validators(url))
+        if r.status_code == 304:
+            stats.current_source()["status"] = "cached"
+            return source_cache.reuse(url)
+        code = r.text
+        filename = url.split("/")[-1]
+        digest = hashlib.sha256(r.content).hexdigest()
+        key = member_cache.content_key(digest, filename)
+        data = member_cache.get(key)
+        if data is MemberCache.MISS:
+            data = parse_member(code, filename)
+            if data: data['sha256'] = digest
+            member_cache.put(key, data)
+        else:
+            stats.current_source()["files_cached"] += 1
+        plugin = make_record(data, filename, url) if data else None
+        found = [plugin] if plugin else []
+        if plugin:
+            logging.info(f"    [+] {plugin['name']:<25} -> {plugin['category']}")
+        if r.status_code == 200:
+            source_cache.store(url, r, found)
+        return found
+    except Exception as e:
+        logging.error(f"    [!] Raw File Error for {url}: {e}")
+        stats.error(str(e))
+    return []
+
+def fetch_source(url):
+    with stats.source(url) as entry:
+        plugins = process_zip_url(url) if url.endswith(".zip") else process_single_url(url)
+        entry["plugins"] = len(plugins)
+        return plugins
+
+def fetch_all(urls, workers):
+    """Fetches every source concurrently; results come back in repos.txt order."""
+    if workers <= 1:
+        return [fetch_source(url) for url in urls]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # map() yields in submission order, so dedup below sees the same
+        # sequence as a sequential build no matter which download finishes first.
+        return list(pool.map(fetch_source, urls))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PwnStore registry builder")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help=f'Concurrent downloads (default: {MAX_WORKERS})')
+    parser.add_argument('--per-host', type=int, default=PER_HOST_LIMIT, help=f'Concurrent downloads per host (default: {PER_HOST_LIMIT})')
+    parser.add_argument('--jobs', type=int, default=PARSE_JOBS, help='Parse archive members in N processes (default: off)')
+    parser.add_argument('--parse-timeout', type=float, default=PARSE_TIMEOUT, help=f'Per-file parse time limit with --jobs (default: {PARSE_TIMEOUT}s)')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not update the source cache')
+    parser.add_argument('--profile', nargs='?', const=PROFILE_FILE, metavar='FILE', help=f'Write cProfile stats for the build (default: {PROFILE_FILE})')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    global MAX_WORKERS, PER_HOST_LIMIT, _session, source_cache, member_cache
+    args = parse_args(argv)
+    MAX_WORKERS = max(1, args.workers)
+    PER_HOST_LIMIT = max(1, args.per_host)
+    _session = None
+    _host_slots.clear()
+    stats.reset()
+    source_cache = SourceCache(None if args.no_cache else SOURCE_CACHE_FILE)
+    source_cache.load()
+    member_cache = MemberCache(None if args.no_cache else MEMBER_CACHE_FILE)
+    member_cache.load()
+
+    if not args.profile:
+        return build(args)
+
+    # cProfile only sees the thread it runs in, so profile a sequential fetch
+    MAX_WORKERS = 1
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(build, args)
+    finally:
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+        print(f"[*] Profile written to {args.profile} (open with: python -m pstats {args.profile})")
+
+def build(args):
+    global parse_pool
+    start = time.perf_counter()
     print("--- PwnStore Builder v1.2 Starting ---")
     master_list = []
     
@@ -117,36 +756,161 @@ def main():
     with open(INPUT_FILE, "r") as f:
         urls = [line.strip() for line in f.readlines() if line.strip() and not line.startswith("#")]
 
-    for url in urls:
-        if url.endswith(".zip"):
-            plugins = process_zip_url(url)
+    # Start worker processes before the fetch threads exist
+    parse_pool = ParsePool(args.jobs, args.parse_timeout) if args.jobs > 1 else None
+    try:
+        for plugins in fetch_all(urls, MAX_WORKERS):
             master_list.extend(plugins)
-        else:
-            try:
-                # Handle single raw file URL
-                code = requests.get(url, timeout=15).text
-                plugin = parse_python_content(code, url.split("/")[-1], url, None)
-                if plugin:
-                    logging.info(f"    [+] {plugin['name']:<25} -> {plugin['category']}")
-                    master_list.append(plugin)
-            except Exception as e: 
-                logging.error(f"    [!] Raw File Error for {url}: {e}")
+    finally:
+        if parse_pool:
+            parse_pool.close()
+            parse_pool = None
+
+    source_cache.save()
+    member_cache.save()
+    print(f"[*] Sources: {source_cache.reused} reused from cache, {source_cache.refetched} refetched.")
+    print(f"[*] Files: {member_cache.hits} parse results reused from cache.")
 
     # --- DEDUPLICATION AND SORT ---
-    final_plugins = {}
-    for plugin in master_list:
-        name_key = plugin['name'].lower()
-        # Keep the plugin if it's new, or if the current one is a higher version
-        if name_key not in final_plugins or plugin['version'] > final_plugins[name_key]['version']:
-            final_plugins[name_key] = plugin
-            
-    # Sort the final list alphabetically by name
-    sorted_plugins = sorted(final_plugins.values(), key=lambda p: p['name'].lower())
+    with stats.stage("dedupe"):
+        final_plugins = {}
+        for plugin in master_list:
+            name_key = plugin['name'].lower()
+            # Keep the plugin if it's new, or if the current one is a higher version
+            if name_key not in final_plugins or plugin['version'] > final_plugins[name_key]['version']:
+                final_plugins[name_key] = plugin
+                
+        # Sort the final list alphabetically by name
+        sorted_plugins = sorted(final_plugins.values(), key=lambda p: p['name'].lower())
+
+    with stats.stage("write"):
+        with open(OUTPUT_FILE, "w") as f:
+            json.dump(sorted_plugins, f, indent=2)
+        stats.add_bytes("write", os.path.getsize(OUTPUT_FILE))
+        write_registry_artifacts(sorted_plugins)
 
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(sorted_plugins, f, indent=2)
+    write_build_stats(time.perf_counter() - start, plugins_found=len(master_list), plugins_unique=len(sorted_plugins),
+                      sources_reused=source_cache.reused, sources_refetched=source_cache.refetched)
     
     print(f"\n[SUCCESS] Generated sorted registry with {len(sorted_plugins)} unique plugins.")
 
+# --- REGISTRY ARTIFACTS ---
+def minify(data):
+    return json.dumps(data, separators=(',', ':')).encode()
+
+def write_artifact(base, relpath, payload, manifest):
+    path = os.path.join(base, relpath)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(payload)
+    manifest[relpath] = {"sha256": hashlib.sha256(payload).hexdigest(), "size": len(payload)}
+    stats.add_bytes("write", len(payload))
+
+def load_previous_registry(base):
+    """The revision and plugin list of the last published build, from its manifest."""
+    try:
+        with open(os.path.join(base, "manifest.json")) as f:
+            manifest = json.load(f)
+        with open(os.path.join(base, "plugins.min.json"), "rb") as f:
+            registry = f.read()
+    except (OSError, ValueError):
+        return 0, None
+    revision = manifest.get("revision", 0)
+    if hashlib.sha256(registry).hexdigest() != manifest.get("files", {}).get("plugins.min.json", {}).get("sha256"):
+        return revision, None
+    return revision, json.loads(registry)
+
+def registry_delta(old, new, revision):
+    """Delta from revision to revision + 1: names to remove, then [position, record]
+    pairs to insert into what is left (added and changed records)."""
+    old_records = {p['name']: p for p in old}
+    new_names = {p['name'] for p in new}
+    return {
+        "from": revision,
+        "to": revision + 1,
+        "removed": sorted(name for name in old_records if name not in new_names),
+        "records": [[i, p] for i, p in enumerate(new) if old_records.get(p['name']) != p],
+        "sha256": hashlib.sha256(minify(new)).hexdigest(),
+    }
+
+def write_registry_deltas(base, plugins):
+    """Bumps the registry revision when the plugin list changed, publishes the delta
+    from the previous revision and prunes old ones. Returns (revision, delta_base):
+    a client holding any revision from delta_base up can catch up with deltas."""
+    revision, previous = load_previous_registry(base)
+    delta_dir = os.path.join(base, "deltas")
+    os.makedirs(delta_dir, exist_ok=True)
+    if previous != plugins or not revision:
+        if previous and revision:
+            delta = registry_delta(previous, plugins, revision)
+            # Only publish a delta that provably rebuilds this exact registry
+            if minify(apply_registry_delta(previous, delta)) == minify(plugins):
+                payload = minify(delta)
+                with open(os.path.join(delta_dir, f"{revision}.json"), "wb") as f:
+                    f.write(payload)
+                stats.add_bytes("write", len(payload))
+        revision += 1
+
+    for name in os.listdir(delta_dir):
+        start = name[:-len(".json")]
+        if not start.isdigit() or int(start) >= revision or int(start) < revision - DELTA_HISTORY:
+            os.remove(os.path.join(delta_dir, name))
+    delta_base = revision
+    while os.path.exists(os.path.join(delta_dir, f"{delta_base - 1}.json")):
+        delta_base -= 1
+    return revision, delta_base
+
+def write_registry_artifacts(plugins):
+    """Writes REGISTRY_DIR next to OUTPUT_FILE and returns its manifest.
+
+    Everything is derived from the sorted plugin list and byte-for-byte
+    reproducible (gzip mtime is pinned), so unchanged builds leave git clean.
+    """
+    base = os.path.join(os.path.dirname(OUTPUT_FILE), REGISTRY_DIR)
+    shard_dir = os.path.join(base, "categories")
+    files = {}
+    # Created up front: an empty registry writes no shards, but stale ones are still pruned below
+    os.makedirs(shard_dir, exist_ok=True)
+    revision, delta_base = write_registry_deltas(base, plugins)
+
+    registry = minify(plugins)
+    write_artifact(base, "plugins.min.json", registry, files)
+    write_artifact(base, "plugins.min.json.gz", gzip.compress(registry, compresslevel=9, mtime=0), files)
+    if brotli:
+        write_artifact(base, "plugins.min.json.br", brotli.compress(registry), files)
+
+    write_artifact(base, "index.json", minify({p['name']: p for p in plugins}), files)
+    write_artifact(base, "search-index.json", minify(build_search_index(plugins)), files)
+
+    shards = defaultdict(list)
+    for p in plugins:
+        shards[p['category']].append(p)
+    for category, records in sorted(shards.items()):
+        write_artifact(base, f"categories/{category}.json", minify(records), files)
+
+    # Drop shards for categories that no longer have plugins
+    for name in os.listdir(shard_dir):
+        if f"categories/{name}" not in files:
+            os.remove(os.path.join(shard_dir, name))
+
+    manifest = {
+        "revision": revision,
+        "delta_base": delta_base,
+        "plugins": len(plugins),
+        "categories": {category: len(records) for category, records in sorted(shards.items())},
+        "files": files,
+    }
+    with open(os.path.join(base, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def write_build_stats(wall_seconds, **totals):
+    path = os.path.join(os.path.dirname(OUTPUT_FILE), STATS_FILE)
+    try:
+        with open(path, "w") as f:
+            json.dump(stats.report(wall_seconds, **totals), f, indent=2)
+    except OSError as e:
+        logging.warning(f"Could not write {path}: {e}")
+
 if __name__ == "__main__":
     main()
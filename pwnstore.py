@@ -5,15 +5,15 @@ Author: WPA2
 Donations: https://buymeacoffee.com/wpa2
 '''
 
-import requests
+# Keep module-level imports cheap: network, archive and compression modules are
+# imported inside the commands that use them, so `--help`, `uninstall` and
+# `--offline` listings start fast on a Pi Zero. See benchmarks/bench_startup.py.
 import json
 import argparse
 import os
 import sys
-import zipfile
-import io
-import shutil
 import re
+import time
 
 # --- CONFIGURATION ---
 DEFAULT_REGISTRY = "https://raw.githubusercontent.com/wpa-2/pwnagotchi-store/main/plugins.json"
@@ -21,6 +21,32 @@ DEFAULT_REGISTRY = "https://raw.githubusercontent.com/wpa-2/pwnagotchi-store/mai
 CUSTOM_PLUGIN_DIR = "/usr/local/share/pwnagotchi/custom-plugins/"
 CONFIG_FILE = "/etc/pwnagotchi/config.toml"
 
+# Local registry cache: reused without a request for REGISTRY_TTL seconds,
+# then revalidated with ETag/Last-Modified. --offline never touches the network.
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "pwnstore")
+REGISTRY_CACHE_FILE = os.path.join(CACHE_DIR, "registry.json")
+REGISTRY_TTL = 3600
+# A stale cache catches up through at most this many published deltas, else downloads everything
+DELTA_CHAIN_MAX = 10
+OFFLINE = False
+REFRESH = False
+
+# Search index shipped by the builder next to the registry (rebuilt locally if missing)
+SEARCH_INDEX_CACHE_FILE = os.path.join(CACHE_DIR, "search-index.json")
+SEARCH_INDEX_VERSION = 1
+
+# Downloads stream to disk and resume with Range after a dropped connection
+DOWNLOAD_CHUNK = 64 * 1024
+DOWNLOAD_RETRIES = 5
+DOWNLOAD_RETRY_DELAY = 1.0  # seconds, times the attempt number
+
+# What pwnstore installed, so commands don't have to re-read every plugin file
+MANIFEST_FILE = os.path.join(CUSTOM_PLUGIN_DIR, ".pwnstore-manifest.json")
+MANIFEST_VERSION = 1
+
+# Per-phase timings (--timings / --timings-json): "1" prints the table, anything else is a JSON path
+TIMINGS_ENV = "PWNSTORE_TIMINGS"
+
 # ANSI Colors
 GREEN = "\033[92m"
 YELLOW = "\033[93m"
@@ -28,6 +54,115 @@ CYAN = "\033[96m"
 RED = "\033[91m"
 RESET = "\033[0m"
 
+# --- TIMINGS ---
+class Timings:
+    """Wall time, call count and bytes per phase of one command.
+
+    Phases nest (registry.download runs inside a command's own phases), parallel
+    downloads time themselves in worker threads, and net.* covers every request,
+    so rows overlap and don't add up to the total.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}
+        self.start = time.time()
+
+    def enable(self):
+        import threading
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.start = time.time()
+        self.instrument_network()
+
+    def phase(self, name):
+        return _Phase(self, name) if self.enabled else _NO_PHASE
+
+    def record(self, name, seconds=0.0, size=0, calls=1):
+        if not self.enabled: return
+        with self.lock:
+            entry = self.phases.setdefault(name, {'seconds': 0.0, 'calls': 0, 'bytes': 0})
+            entry['seconds'] += seconds
+            entry['calls'] += calls
+            entry['bytes'] += size
+
+    def add_bytes(self, name, size):
+        self.record(name, size=size, calls=0)
+
+    def instrument_network(self):
+        """Times DNS lookups and connection setup (TCP, plus the TLS handshake for HTTPS)."""
+        import socket
+        getaddrinfo = socket.getaddrinfo
+        def timed_getaddrinfo(*args, **kwargs):
+            with self.phase("net.dns"): return getaddrinfo(*args, **kwargs)
+        socket.getaddrinfo = timed_getaddrinfo
+        try:
+            from urllib3.connection import HTTPConnection, HTTPSConnection
+        except ImportError:
+            return
+        for cls in (HTTPConnection, HTTPSConnection):
+            if 'connect' not in cls.__dict__: continue
+            def timed_connect(conn, _connect=cls.__dict__['connect']):
+                with self.phase("net.connect"): return _connect(conn)
+            cls.connect = timed_connect
+
+    def report(self, command):
+        wall = time.time() - self.start
+        uname = os.uname() if hasattr(os, 'uname') else None
+        return {
+            'command': command,
+            'argv': sys.argv[1:],
+            'host': uname.nodename if uname else None,
+            'python': sys.version.split()[0],
+            'started_at': int(self.start),
+            'wall_seconds': round(wall, 4),
+            'phases': {name: dict(entry, seconds=round(entry['seconds'], 4)) for name, entry in sorted(self.phases.items())},
+        }
+
+    def print_table(self, report):
+        out = sys.stderr
+        print(f"\n{'PHASE':<22} | {'CALLS':>5} | {'TIME (s)':>8} | {'BYTES':>9}", file=out)
+        print("-" * 54, file=out)
+        for name, entry in report['phases'].items():
+            size = format_size(entry['bytes']) if entry['bytes'] else "-"
+            print(f"{name:<22} | {entry['calls']:>5} | {entry['seconds']:>8.3f} | {size:>9}", file=out)
+        print("-" * 54, file=out)
+        print(f"Total wall time {report['wall_seconds']:.3f}s (phases overlap, see `pwnstore --help`)", file=out)
+
+class _Phase:
+    __slots__ = ('timings', 'name', 'start')
+
+    def __init__(self, timings, name):
+        self.timings, self.name = timings, name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.timings.record(self.name, time.perf_counter() - self.start)
+
+class _NoPhase:
+    def __enter__(self): pass
+    def __exit__(self, *exc): pass
+
+_NO_PHASE = _NoPhase()
+timings = Timings()
+
+def finish_timings(command, destination):
+    """Prints the timing table (destination None) or writes the report as JSON ('-' for stdout)."""
+    report = timings.report(command)
+    if destination is None:
+        timings.print_table(report)
+        return
+    try:
+        if destination == '-':
+            print(json.dumps(report, indent=2))
+        else:
+            with open(destination, 'w') as f:
+                json.dump(report, f, indent=2)
+    except OSError as e:
+        print(f"{YELLOW}[!] Could not write timings to {destination}: {e}{RESET}", file=sys.stderr)
+
 def banner():
     print(f"{CYAN}")
     print(r"  ____                _____ _                  ")
@@ -60,10 +195,123 @@ def get_local_version(file_path):
         pass
     return "0.0.0"
 
+def file_sha256(file_path):
+    import hashlib
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def write_file_atomic(file_path, data):
+    """Writes data to a temp file beside file_path, fsyncs it and renames it into place.
+    An existing file keeps its permissions and owner."""
+    tmp = f"{file_path}.tmp"
+    try:
+        with open(tmp, 'w' if isinstance(data, str) else 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            st = os.stat(file_path)
+            os.chmod(tmp, st.st_mode & 0o7777)
+            os.chown(tmp, st.st_uid, st.st_gid)
+        except OSError:
+            pass
+        os.replace(tmp, file_path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+    # Persist the rename itself, or a power cut can still bring back the old file
+    try:
+        dir_fd = os.open(os.path.dirname(os.path.abspath(file_path)), os.O_RDONLY)
+        try: os.fsync(dir_fd)
+        finally: os.close(dir_fd)
+    except OSError:
+        pass
+
+def sync_manifest(manifest):
+    """Matches the manifest to the plugin directory. Files copied in by hand are added as
+    local (read once, here), entries whose file was deleted are dropped. Returns True if
+    anything changed."""
+    try:
+        on_disk = {f[:-3] for f in os.listdir(CUSTOM_PLUGIN_DIR) if f.endswith(".py")}
+    except OSError:
+        on_disk = set()
+    gone = [name for name in manifest if name not in on_disk]
+    for name in gone:
+        del manifest[name]
+    added = sorted(on_disk - set(manifest))
+    for name in added:
+        file_path = os.path.join(CUSTOM_PLUGIN_DIR, f"{name}.py")
+        manifest[name] = {
+            'version': get_local_version(file_path),
+            'source': 'local',
+            'download_url': None,
+            'path_inside_zip': None,
+            'sha256': file_sha256(file_path),
+            'installed_at': int(os.path.getmtime(file_path)),
+        }
+    return bool(gone or added)
+
+_manifest = None
+
+def load_manifest():
+    """Returns {name: entry} as recorded, creating the manifest from disk on first use."""
+    global _manifest
+    if _manifest is not None:
+        return _manifest
+    try:
+        with timings.phase("manifest.load"), open(MANIFEST_FILE, 'r') as f:
+            data = json.load(f)
+        if data.get('version') == MANIFEST_VERSION:
+            _manifest = data['plugins']
+            return _manifest
+    except (OSError, ValueError, KeyError):
+        pass
+    _manifest = {}
+    with timings.phase("manifest.scan"):
+        sync_manifest(_manifest)
+    save_manifest()
+    return _manifest
+
+def save_manifest():
+    try:
+        with timings.phase("manifest.save"):
+            write_file_atomic(MANIFEST_FILE, json.dumps({'version': MANIFEST_VERSION, 'plugins': _manifest}, indent=2, sort_keys=True))
+    except OSError:
+        pass  # read-only without sudo; the next privileged command writes it
+
+def record_install(plugin_data, file_path):
+    load_manifest()[plugin_data['name']] = {
+        'version': plugin_data['version'],
+        'source': 'store',
+        'download_url': plugin_data['download_url'],
+        'path_inside_zip': plugin_data.get('path_inside_zip'),
+        'sha256': file_sha256(file_path),
+        'installed_at': int(time.time()),
+    }
+
 def get_installed_plugins():
-    if not os.path.exists(CUSTOM_PLUGIN_DIR):
-        return []
-    return [f.replace(".py", "") for f in os.listdir(CUSTOM_PLUGIN_DIR) if f.endswith(".py")]
+    """The manifest, synced with the plugin directory: a listdir, plus reading any new file."""
+    manifest = load_manifest()
+    with timings.phase("manifest.sync"):
+        changed = sync_manifest(manifest)
+    if changed: save_manifest()
+    return manifest
+
+def install_state(name, installed):
+    """'installed' (by pwnstore), 'local' (on disk, not from the store) or 'available'."""
+    entry = installed.get(name)
+    if not entry: return 'available'
+    return 'installed' if entry.get('source') == 'store' else 'local'
+
+def install_status(name, installed):
+    state = install_state(name, installed)
+    if state == 'installed': return f"{GREEN}INSTALLED{RESET}"
+    if state == 'local': return f"{YELLOW}LOCAL{RESET}"
+    return "Available"
 
 def get_registry_url():
     """Checks config.toml for a developer override, otherwise uses public GitHub."""
@@ -79,22 +327,182 @@ def get_registry_url():
         pass
     return DEFAULT_REGISTRY
 
+def load_registry_cache(url):
+    """Returns the cached registry entry for url, or None."""
+    try:
+        with open(REGISTRY_CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+        if cache.get('url') == url and isinstance(cache.get('plugins'), list):
+            return cache
+    except:
+        pass
+    return None
+
+def save_registry_cache(cache):
+    """Atomically replaces the registry cache; failures only cost the next fetch."""
+    try:
+        with timings.phase("registry.cache_save"):
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp = REGISTRY_CACHE_FILE + ".tmp"
+            with open(tmp, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp, REGISTRY_CACHE_FILE)
+    except Exception:
+        pass
+
+def describe_age(seconds):
+    if seconds < 120: return f"{int(seconds)}s"
+    if seconds < 7200: return f"{int(seconds // 60)}m"
+    if seconds < 172800: return f"{int(seconds // 3600)}h"
+    return f"{int(seconds // 86400)}d"
+
+def registry_file_url(relpath):
+    """URL of a builder artifact in the registry/ folder published next to plugins.json."""
+    return get_registry_url().rsplit('/', 1)[0] + "/registry/" + relpath
+
+def apply_registry_delta(plugins, delta):
+    """The registry after one delta: removed and changed records dropped, then
+    added and changed records inserted at their new positions."""
+    replaced = set(delta['removed']) | {record['name'] for _, record in delta['records']}
+    result = [p for p in plugins if p['name'] not in replaced]
+    for position, record in delta['records']:
+        result.insert(position, record)
+    return result
+
+def fetch_registry_manifest(requests, cache):
+    """The published registry manifest, or None if there isn't one (e.g. a custom registry URL).
+    A 304 for the cached revision comes back as {'unchanged': True}."""
+    headers = {}
+    if cache and cache.get('revision') and cache.get('manifest_etag'):
+        headers['If-None-Match'] = cache['manifest_etag']
+    with timings.phase("registry.manifest"):
+        r = requests.get(registry_file_url("manifest.json"), timeout=15, headers=headers)
+    if r.status_code == 304:
+        return {'unchanged': True}
+    if r.status_code != 200:
+        return None
+    try:
+        manifest = r.json()
+        manifest['etag'] = r.headers.get('ETag')
+        manifest['sha256'] = manifest['files']['plugins.min.json']['sha256']
+        return manifest if isinstance(manifest.get('revision'), int) else None
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def update_registry_by_delta(requests, cache, manifest):
+    """Brings the cached registry to the manifest's revision with published deltas.
+    Returns the updated plugin list, or None when a full download is needed."""
+    revision, target = cache.get('revision'), manifest['revision']
+    if not revision or revision > target or target - revision > DELTA_CHAIN_MAX: return None
+    if revision < manifest.get('delta_base', target): return None
+    plugins = cache['plugins']
+    try:
+        for start in range(revision, target):
+            r = requests.get(registry_file_url(f"deltas/{start}.json"), timeout=15)
+            if r.status_code != 200: return None
+            delta = r.json()
+            if delta.get('from') != start: return None
+            plugins = apply_registry_delta(plugins, delta)
+    except (ValueError, KeyError, TypeError):
+        return None
+    # Deltas must rebuild exactly what a full download would give
+    if registry_digest(plugins) != manifest['sha256']: return None
+    return plugins
+
+class StoreError(Exception):
+    """A failure the CLI reports before exiting; `serve` answers with it instead."""
+
+    def __init__(self, message, *details):
+        super().__init__(message)
+        self.details = details
+
+def use_stale_cache(cache, reason):
+    print(f"{YELLOW}[!] {reason}; using cached registry from {describe_age(time.time() - cache['fetched_at'])} ago.{RESET}")
+    return cache['plugins']
+
 def fetch_registry():
+    """The registry for CLI commands: exits with a message when there is none to be had."""
+    try:
+        return load_registry(REFRESH)
+    except StoreError as e:
+        print(f"{RED}[!] {e}{RESET}")
+        for line in e.details: print(f"    {line}")
+        sys.exit(1)
+
+def load_registry(refresh=False):
+    """The registry from the cache, published deltas or a full download. Raises StoreError."""
     url = get_registry_url()
+    with timings.phase("registry.cache_load"):
+        cache = load_registry_cache(url)
+
+    if OFFLINE:
+        if cache:
+            return cache['plugins']
+        raise StoreError("Offline mode: no cached registry yet. Run once without --offline.")
+
+    if cache and not refresh and time.time() - cache['fetched_at'] < REGISTRY_TTL:
+        return cache['plugins']
+
+    import requests
+
     try:
-        r = requests.get(url, timeout=15)
-        if r.status_code != 200:
-            print(f"{RED}[!] Could not connect to store (Status: {r.status_code}){RESET}")
-            sys.exit(1)
-        return r.json()
+        manifest = fetch_registry_manifest(requests, cache)
+        if cache and manifest and manifest.get('unchanged'):
+            cache['fetched_at'] = time.time()
+            save_registry_cache(cache)
+            return cache['plugins']
+        if cache and manifest:
+            with timings.phase("registry.delta"):
+                plugins = update_registry_by_delta(requests, cache, manifest)
+            if plugins is not None:
+                if plugins is not cache['plugins']:
+                    # The plugins.json validators describe an older file now
+                    cache.update(etag=None, last_modified=None)
+                    print(f"[*] Registry updated to revision {manifest['revision']} (delta).")
+                cache.update(plugins=plugins, revision=manifest['revision'], manifest_etag=manifest['etag'], fetched_at=time.time())
+                save_registry_cache(cache)
+                return plugins
+
+        # No validators once the manifest names a revision we don't have: a 304 would pin the old copy
+        headers = {}
+        if cache and not (manifest and cache.get('revision')):
+            if cache.get('etag'): headers['If-None-Match'] = cache['etag']
+            if cache.get('last_modified'): headers['If-Modified-Since'] = cache['last_modified']
+        with timings.phase("registry.download"):
+            r = requests.get(url, timeout=15, headers=headers)
+            if r.status_code == 304 and cache and manifest and registry_digest(cache['plugins']) != manifest['sha256']:
+                # The cache's revision is unknown and its copy isn't the published one
+                r = requests.get(url, timeout=15)
+            timings.add_bytes("registry.download", len(r.content))
+        if r.status_code == 304 and cache:
+            plugins = cache['plugins']
+        elif r.status_code == 200:
+            with timings.phase("registry.parse"):
+                plugins = r.json()
+        else:
+            if cache: return use_stale_cache(cache, f"Store returned status {r.status_code}")
+            raise StoreError(f"Could not connect to store (Status: {r.status_code})")
+        # Remember which revision this is, so the next update can use deltas
+        with timings.phase("registry.verify"):
+            current = manifest and registry_digest(plugins) == manifest['sha256']
+        save_registry_cache({
+            'url': url,
+            'etag': r.headers.get('ETag') or (cache and cache.get('etag')),
+            'last_modified': r.headers.get('Last-Modified') or (cache and cache.get('last_modified')),
+            'fetched_at': time.time(),
+            'plugins': plugins,
+            'revision': manifest['revision'] if current else None,
+            'manifest_etag': manifest['etag'] if current else None,
+        })
+        return plugins
     except requests.exceptions.ConnectionError:
-        print(f"{RED}[!] No Internet Connection Detected.{RESET}")
-        print(f"    Please connect your Pwnagotchi to the internet.")
-        print(f"    {YELLOW}Guide: https://github.com/jayofelony/pwnagotchi/wiki/Step-2-Connecting{RESET}")
-        sys.exit(1)
+        if cache: return use_stale_cache(cache, "No Internet Connection Detected")
+        raise StoreError("No Internet Connection Detected.",
+                         "Please connect your Pwnagotchi to the internet.",
+                         f"{YELLOW}Guide: https://github.com/jayofelony/pwnagotchi/wiki/Step-2-Connecting{RESET}")
     except Exception as e:
-        print(f"{RED}[!] Connection failed: {e}{RESET}")
-        sys.exit(1)
+        if cache: return use_stale_cache(cache, f"Connection failed ({e})")
+        raise StoreError(f"Connection failed: {e}")
 
 def clean_author_name(author):
     """Removes emails, URLs, and numeric IDs for clean display."""
@@ -133,7 +541,7 @@ def list_plugins(args):
         name = p['name']
         if len(name) > 24: name = name[:21] + "..."
             
-        status = f"{GREEN}INSTALLED{RESET}" if name in installed else "Available"
+        status = install_status(p['name'], installed)
         
         # APPLY CLEANUP LOGIC
         author = clean_author_name(p.get('author', 'Unknown'))
@@ -167,16 +575,175 @@ def list_sources(args):
     print("-" * 65)
     print(f"Total Plugins Indexed: {len(registry)}\n")
 
+# --- SEARCH ---
+NAME_WEIGHT = 3        # a hit in the name outranks the same hit in the description
+FUZZY_THRESHOLD = 0.34 # trigram similarity needed for a typo match
+
+def registry_digest(registry):
+    """SHA-256 of the minified registry, the same bytes the builder publishes as plugins.min.json."""
+    import hashlib
+    return hashlib.sha256(json.dumps(registry, separators=(',', ':')).encode()).hexdigest()
+
+def search_tokens(text):
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+def token_trigrams(token):
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def build_search_index(registry):
+    """Inverted index over names and descriptions, plus a trigram map of the vocabulary.
+
+    vocabulary: sorted tokens; postings[i] lists the records holding vocabulary[i],
+                each as record id * 2 + 1 for a name hit, record id * 2 for a description hit
+    trigrams:   trigram -> [vocabulary position], for typo-tolerant lookups
+    """
+    tokens = {}
+    for rid, p in enumerate(registry):
+        name_tokens = set(search_tokens(p['name'])) | {p['name'].lower()}
+        desc_tokens = set(search_tokens(p.get('description') or '')) - name_tokens
+        for token in name_tokens: tokens.setdefault(token, []).append(rid * 2 + 1)
+        for token in desc_tokens: tokens.setdefault(token, []).append(rid * 2)
+    vocabulary = sorted(tokens)
+    trigrams = {}
+    for position, token in enumerate(vocabulary):
+        for gram in token_trigrams(token):
+            trigrams.setdefault(gram, []).append(position)
+    return {
+        'version': SEARCH_INDEX_VERSION,
+        'registry_sha256': registry_digest(registry),
+        'vocabulary': vocabulary,
+        'postings': [sorted(tokens[token]) for token in vocabulary],
+        'trigrams': dict(sorted(trigrams.items())),
+    }
+
+def edit_distance(a, b):
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions)."""
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+def search_index_url():
+    return registry_file_url("search-index.json")
+
+def load_search_index(registry):
+    """The index matching this exact registry: cached, downloaded, or built on the spot."""
+    digest = registry_digest(registry)
+    def usable(index):
+        return isinstance(index, dict) and index.get('version') == SEARCH_INDEX_VERSION and index.get('registry_sha256') == digest
+
+    try:
+        with open(SEARCH_INDEX_CACHE_FILE, 'r') as f:
+            index = json.load(f)
+        if usable(index): return index
+    except (OSError, ValueError):
+        pass
+
+    index = None
+    if not OFFLINE:
+        try:
+            import requests
+            r = requests.get(search_index_url(), timeout=15)
+            if r.status_code == 200 and usable(r.json()): index = r.json()
+        except Exception:
+            pass
+    if index is None:
+        index = build_search_index(registry)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        write_file_atomic(SEARCH_INDEX_CACHE_FILE, json.dumps(index, separators=(',', ':')))
+    except OSError:
+        pass
+    return index
+
+def ranked_search(registry, index, query, category=None, author=None):
+    """Registry records matching query, best first.
+
+    Each query word scores its best hit per record: exact token, then token
+    prefix, then trigram (typo) match, then substring, weighted up when it
+    hits the name. Results always include what a plain substring scan finds.
+    Records matching more query words rank first; an exact name match tops all.
+    """
+    from bisect import bisect_left
+
+    def passes(p):
+        if category and p.get('category', '').lower() != category.lower(): return False
+        if author:
+            raw = p.get('author') or ''
+            if author.lower() not in raw.lower() and author.lower() not in clean_author_name(raw).lower(): return False
+        return True
+
+    query = query.strip().lower()
+    if not query:
+        return sorted((p for p in registry if passes(p)), key=lambda p: p['name'].lower())
+
+    vocabulary, postings = index['vocabulary'], index['postings']
+    scores, matched = {}, {}
+    for word in search_tokens(query) or [query]:
+        hits = {}
+        def add(position, weight):
+            for code in postings[position]:
+                score = weight * (NAME_WEIGHT if code & 1 else 1)
+                if score > hits.get(code >> 1, 0): hits[code >> 1] = score
+
+        start = bisect_left(vocabulary, word)
+        exact = start < len(vocabulary) and vocabulary[start] == word
+        if exact: add(start, 3.0)
+        end = start
+        if len(word) >= 2:
+            end = bisect_left(vocabulary, word + '\x7f', start)
+            for position in range(start + exact, end): add(position, 2.0)
+        if len(word) >= 3:
+            grams = token_trigrams(word)
+            shared = {}
+            for gram in grams:
+                for position in index['trigrams'].get(gram, ()):
+                    shared[position] = shared.get(position, 0) + 1
+            for position, count in shared.items():
+                if start <= position < max(end, start + exact): continue
+                token = vocabulary[position]
+                similarity = count / (len(grams) + len(token_trigrams(token)) - count)
+                # Trigrams catch most typos; swapped letters need the edit distance check
+                if similarity < FUZZY_THRESHOLD:
+                    if len(word) < 4 or abs(len(token) - len(word)) > 2: continue
+                    if edit_distance(word, token) > max(1, len(word) // 4): continue
+                    similarity = FUZZY_THRESHOLD
+                add(position, 1.5 * similarity)
+        # Substring hits rank below prefixes. Tokens are whole alphanumeric runs (plus full
+        # names), so every match a plain substring scan would find is inside one of them.
+        for position, token in enumerate(vocabulary):
+            if word in token: add(position, 1.0)
+
+        for rid, score in hits.items():
+            scores[rid] = scores.get(rid, 0) + score
+            matched[rid] = matched.get(rid, 0) + 1
+
+    for rid in scores:
+        if registry[rid]['name'].lower() == query: scores[rid] += 100
+    ranked = sorted(scores, key=lambda rid: (-matched[rid], -scores[rid], registry[rid]['name'].lower()))
+    return [registry[rid] for rid in ranked if passes(registry[rid])]
+
 def search_plugins(args):
-    print(f"[*] Searching for '{args.query}'...")
+    filters = "".join(f" [{label}: {value}]" for label, value in (("category", args.category), ("author", args.author)) if value)
+    subject = f"'{args.query}'" if args.query else "plugins"
+    print(f"[*] Searching for {subject}{filters}...")
     registry = fetch_registry()
     installed = get_installed_plugins()
     
-    query = args.query.lower()
-    results = [p for p in registry if query in p['name'].lower() or query in p['description'].lower()]
+    with timings.phase("search.index"):
+        index = load_search_index(registry)
+    with timings.phase("search.query"):
+        results = ranked_search(registry, index, args.query, args.category, args.author)
     
     if not results:
-        print(f"{YELLOW}[!] No plugins found matching '{args.query}'{RESET}")
+        print(f"{YELLOW}[!] No plugins found matching {subject}{filters}{RESET}")
         return
 
     # NEW WIDER TABLE HEADERS
@@ -187,7 +754,7 @@ def search_plugins(args):
         name = p['name']
         if len(name) > 24: name = name[:21] + "..."
             
-        status = f"{GREEN}INSTALLED{RESET}" if name in installed else "Available"
+        status = install_status(p['name'], installed)
         
         # APPLY CLEANUP LOGIC
         author = clean_author_name(p.get('author', 'Unknown'))
@@ -216,68 +783,90 @@ def show_info(args):
     print(plugin_data['download_url'])
     print("")
 
-def scan_for_config_params(file_path, plugin_name):
-    """Smartly scans for config usage while ignoring API/Data calls."""
+CONFIG_PARAM_IGNORE = ['main', 'plugins', 'enabled', 'name', 'whitelist', 'screen', 'display', 'none', 'false', 'true']
+
+def is_config_param(key, plugin_name):
+    """Filters out keys that are never user settings (config scaffolding, URLs, paths)."""
+    if 'http' in key or '/' in key: return False
+    return key not in CONFIG_PARAM_IGNORE and key != plugin_name and len(key) > 2
+
+def scan_config_lines(lines, plugin_name):
+    """Line heuristics for config keys: self.options[...] plus .get() on config-looking lines."""
     params = []
-    ignore = ['main', 'plugins', 'enabled', 'name', 'whitelist', 'screen', 'display', 'none', 'false', 'true', plugin_name]
-    
+    for line in lines:
+        if any(bad in line for bad in ['requests.get', 'result.get', 'data.get', 'resp.get', 'json.get']):
+            continue
+        
+        matches = re.findall(r"self\.options\s*\[\s*['\"]([^'\"]+)['\"]\s*\]", line)
+        
+        if 'config' in line or 'options' in line or 'kwargs' in line:
+            matches += re.findall(r"\.get\(\s*['\"]([^'\"]+)['\"]", line)
+        
+        params += [m for m in matches if is_config_param(m, plugin_name)]
+    return sorted(set(params))
+
+def scan_for_config_params(file_path, plugin_name):
+    """Scans an installed plugin for config usage; only for registries without config_params."""
     try:
         with open(file_path, 'r', errors='ignore') as f:
-            for line in f:
-                if any(bad in line for bad in ['requests.get', 'result.get', 'data.get', 'resp.get', 'json.get']):
-                    continue
-                
-                matches = re.findall(r"self\.options\s*\[\s*['\"]([^'\"]+)['\"]\s*\]", line)
-                
-                if 'config' in line or 'options' in line or 'kwargs' in line:
-                    matches += re.findall(r"\.get\(\s*['\"]([^'\"]+)['\"]", line)
-                
-                for m in matches:
-                    if 'http' in m or '/' in m: continue
-                    
-                    if m not in ignore and len(m) > 2:
-                        params.append(m)
+            return scan_config_lines(f, plugin_name)
     except:
-        pass
-    return sorted(list(set(params)))
+        return []
 
 def update_self(args):
     check_sudo()
+    import requests
     print(f"[*] Checking for tool updates...")
     current_registry = get_registry_url()
     script_url = current_registry.replace("plugins.json", "pwnstore.py")
     
+    current_file = os.path.realpath(__file__)
+    tmp = f"{current_file}.pwnstore-tmp"
     try:
         print(f"[*] Downloading latest version...")
-        r = requests.get(script_url, timeout=15)
-        if r.status_code != 200:
-            print(f"{RED}[!] Update failed: Server returned {r.status_code}{RESET}")
-            return
-        if "#!/usr/bin/env python3" not in r.text: return
+        progress = DownloadProgress()
+        with open(tmp, 'wb') as f:
+            download(script_url, f, progress)
+        progress.finish()
+        with open(tmp, 'r', errors='ignore') as f:
+            if "#!/usr/bin/env python3" not in f.read(): return
 
-        current_file = os.path.realpath(__file__)
-        with open(current_file, 'w') as f:
-            f.write(r.text)
-        os.chmod(current_file, 0o755)
+        # Replace the script in one step, so an interrupted update can't leave half of it
+        os.chmod(tmp, 0o755)
+        os.replace(tmp, current_file)
         print(f"{GREEN}[+] PwnStore updated successfully! Run 'pwnstore list' to verify version.{RESET}")
+    except requests.exceptions.HTTPError as e: print(f"{RED}[!] Update failed: Server returned {e.response.status_code}{RESET}")
     except Exception as e: print(f"{RED}[!] Update failed: {e}{RESET}")
+    finally:
+        if os.path.exists(tmp): os.remove(tmp)
+
+def find_updates(registry):
+    """Installed plugins whose registry copy differs: [{name, local, remote}]."""
+    index = {p['name']: p for p in registry}
+    updates_found = []
+
+    with timings.phase("upgrade.scan"):
+        for plugin_name, entry in sorted(get_installed_plugins().items()):
+            remote_data = index.get(plugin_name)
+            
+            if remote_data:
+                local_ver = entry['version']
+                remote_ver = remote_data['version']
+                if remote_data.get('sha256'):
+                    # Compare content, not version strings: catches unbumped versions, skips no-op bumps.
+                    # The manifest hash is what we installed; `verify` catches later edits on disk.
+                    changed = remote_data['sha256'] != entry.get('sha256')
+                else:
+                    changed = remote_ver != local_ver
+                if changed:
+                    updates_found.append({"name": plugin_name, "local": local_ver, "remote": remote_ver})
+    return updates_found
 
 def upgrade_plugins(args):
     check_sudo()
     print(f"[*] Checking for plugin updates...")
     registry = fetch_registry()
-    installed_files = [f for f in os.listdir(CUSTOM_PLUGIN_DIR) if f.endswith(".py")]
-    updates_found = []
-
-    for filename in installed_files:
-        plugin_name = filename.replace(".py", "")
-        remote_data = next((p for p in registry if p['name'] == plugin_name), None)
-        
-        if remote_data:
-            local_ver = get_local_version(os.path.join(CUSTOM_PLUGIN_DIR, filename))
-            remote_ver = remote_data['version']
-            if remote_ver != local_ver:
-                updates_found.append({"name": plugin_name, "local": local_ver, "remote": remote_ver})
+    updates_found = find_updates(registry)
 
     if not updates_found:
         print(f"{GREEN}[+] All plugins are up to date.{RESET}")
@@ -285,62 +874,394 @@ def upgrade_plugins(args):
 
     print(f"\n{YELLOW}Updates available:{RESET}")
     for u in updates_found:
-        print(f"  • {CYAN}{u['name']}{RESET}: v{u['local']} -> v{u['remote']}")
+        note = " (code changed)" if u['local'] == u['remote'] else ""
+        print(f"  • {CYAN}{u['name']}{RESET}: v{u['local']} -> v{u['remote']}{note}")
 
     print(f"\n{YELLOW}Do you want to upgrade these {len(updates_found)} plugins? (Y/n){RESET}")
     try: choice = input().lower()
     except KeyboardInterrupt: return
     
     if choice == 'y' or choice == '':
-        for u in updates_found:
-            class MockArgs: name = u['name']
-            print(f"\n[*] Upgrading {u['name']}...")
-            install_plugin(MockArgs())
-        print(f"\n{GREEN}[+] Upgrade complete! Please restart Pwnagotchi.{RESET}")
+        if install_plugins([u['name'] for u in updates_found], registry):
+            print(f"\n{GREEN}[+] Upgrade complete! Please restart Pwnagotchi.{RESET}")
     else: print("[*] Cancelled.")
 
-def install_plugin(args):
-    check_sudo()
-    if not is_safe_name(args.name): return
-    target_name = args.name
-    registry = fetch_registry()
-    plugin_data = next((p for p in registry if p['name'] == target_name), None)
-    
-    if not plugin_data:
-        print(f"{RED}[!] Plugin '{target_name}' not found in registry.{RESET}")
-        return
+# --- DOWNLOADS ---
+def format_size(size):
+    if size < 1024: return f"{size} B"
+    if size < 1024 * 1024: return f"{size / 1024:.1f} KB"
+    return f"{size / 1024 / 1024:.1f} MB"
 
-    print(f"[*] Installing {CYAN}{target_name}{RESET} by {plugin_data['author']}...")
-    final_file_path = os.path.join(CUSTOM_PLUGIN_DIR, f"{target_name}.py")
+class IncompleteDownload(Exception):
+    """The connection closed before the announced length arrived."""
+
+class DownloadProgress:
+    """One progress line shared by all the downloads of a command (they run in parallel)."""
+
+    def __init__(self):
+        import threading
+        self.lock = threading.Lock()
+        self.done = self.total = self.received = self.resumed = 0
+        self.start = time.time()
+        self.drawn = 0
+        self.tty = sys.stdout.isatty()
+
+    def expect(self, size):
+        with self.lock: self.total += size
+
+    def add(self, size):
+        with self.lock:
+            self.done += size
+            self.received += size
+            if self.tty and time.time() - self.drawn > 0.2: self.draw()
+
+    def resume(self):
+        with self.lock: self.resumed += 1
+
+    def discard(self, size):
+        """A retry without Range support starts over; size bytes don't count anymore."""
+        with self.lock: self.done -= size
+
+    def rate(self):
+        return self.received / max(time.time() - self.start, 1e-6)
+
+    def draw(self):
+        self.drawn = time.time()
+        percent = f" {100 * self.done // self.total:3d}%" if self.total else ""
+        line = f"[*] Downloading {format_size(self.done)} / {format_size(self.total)}{percent} at {format_size(int(self.rate()))}/s"
+        sys.stdout.write(f"\r{line:<72}")
+        sys.stdout.flush()
+
+    def finish(self):
+        if not self.received: return
+        if self.tty:
+            self.draw()
+            sys.stdout.write("\n")
+        resumed = f", resumed {self.resumed}x" if self.resumed else ""
+        print(f"[*] Downloaded {format_size(self.received)} in {time.time() - self.start:.1f}s "
+              f"({format_size(int(self.rate()))}/s{resumed})")
+
+def download(url, f, progress=None):
+    """Streams url into the binary file f in chunks. After a dropped connection it asks
+    for the rest with Range (If-Range guards against the file changing in between);
+    a server without Range support sends it all again. Returns the bytes written."""
+    import requests
+    progress = progress or DownloadProgress()
+    written, total, validator = 0, None, None
+    start = time.perf_counter()
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        # Identity encoding, so byte offsets mean the same thing on every attempt
+        headers = {'Accept-Encoding': 'identity'}
+        if written:
+            headers['Range'] = f"bytes={written}-"
+            if validator: headers['If-Range'] = validator
+        try:
+            with requests.get(url, headers=headers, timeout=30, stream=True) as r:
+                if written and r.status_code == 206 and r.headers.get('Content-Range', '').startswith(f"bytes {written}-"):
+                    progress.resume()
+                elif r.status_code == 200:
+                    if written:
+                        progress.discard(written)
+                        f.seek(0)
+                        f.truncate()
+                        written = 0
+                else:
+                    r.raise_for_status()
+                    raise IncompleteDownload(f"unexpected status {r.status_code} resuming {url}")
+
+                if total is None:
+                    length = r.headers.get('Content-Length')
+                    total = written + int(length) if length and length.isdigit() else None
+                    if total: progress.expect(total)
+                    etag = r.headers.get('ETag')
+                    validator = etag if etag and not etag.startswith('W/') else r.headers.get('Last-Modified')
+
+                for chunk in r.iter_content(DOWNLOAD_CHUNK):
+                    f.write(chunk)
+                    written += len(chunk)
+                    progress.add(len(chunk))
+                if total and written < total:
+                    raise IncompleteDownload(f"got {written} of {total} bytes")
+            f.flush()
+            timings.record("download", time.perf_counter() - start, size=written)
+            return written
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout, IncompleteDownload):
+            if attempt == DOWNLOAD_RETRIES: raise
+            timings.record("download.retry")
+            time.sleep(DOWNLOAD_RETRY_DELAY * (attempt + 1))
+
+# --- REMOTE ZIP (HTTP Range) ---
+class RangeNotSupported(Exception):
+    """The server or archive can't be read piecewise; download the whole thing instead."""
+
+ZIP_TAIL_SIZE = 65536 + 22  # EOCD record plus the longest possible archive comment
+
+def http_range(url, first=None, last=None, version=None):
+    """GETs bytes first..last (or the last -first bytes when last is None). Returns (data, total size).
+
+    version ties several ranges to one copy of the file: the first call records the
+    response's ETag/Last-Modified in it, later calls send it as If-Range and raise
+    RangeNotSupported if the file has changed since.
+    """
+    import requests
+    spec = f"bytes={first}-{last}" if last is not None else f"bytes=-{-first}"
+    headers = {'Range': spec, 'Accept-Encoding': 'identity'}
+    if version and version.get('validator'):
+        headers['If-Range'] = version['validator']
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        try:
+            with timings.phase("download.range"), \
+                    requests.get(url, headers=headers, timeout=30, stream=True) as r:
+                if r.status_code != 206 or not r.headers.get('Content-Range', '').startswith('bytes '):
+                    raise RangeNotSupported(f"server answered {r.status_code} to a Range request")
+                if version is not None:
+                    seen = (r.headers.get('ETag'), r.headers.get('Last-Modified'))
+                    if 'seen' not in version:
+                        # If-Range only takes a strong ETag or a date
+                        etag = seen[0] if seen[0] and not seen[0].startswith('W/') else None
+                        version.update(seen=seen, validator=etag or seen[1])
+                    elif seen != version['seen']:
+                        raise RangeNotSupported("archive changed between Range requests")
+                total = r.headers['Content-Range'].rsplit('/', 1)[-1]
+                timings.add_bytes("download.range", len(r.content))
+                return r.content, int(total) if total.isdigit() else None
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError, requests.exceptions.Timeout):
+            # Ranges are small; a dropped one is simply asked for again
+            if attempt == DOWNLOAD_RETRIES: raise
+            time.sleep(DOWNLOAD_RETRY_DELAY * (attempt + 1))
+
+def read_central_directory(url):
+    """Reads only the end of a remote ZIP.
+    Returns ({name: entry}, archive size, tail bytes, tail offset, version for http_range)."""
+    import struct
+    version = {}
+    tail, total = http_range(url, -ZIP_TAIL_SIZE, version=version)
+    if total is None:
+        raise RangeNotSupported("unknown archive size")
+    tail_start = total - len(tail)
+    eocd = tail.rfind(b'PK\x05\x06')
+    if eocd < 0 or len(tail) - eocd < 22:
+        raise RangeNotSupported("end of central directory not found")
+    _, _, _, _, _, cd_size, cd_offset, _ = struct.unpack('<4s4H2IH', tail[eocd:eocd + 22])
+    if cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF:
+        raise RangeNotSupported("ZIP64 archive")
+
+    if cd_offset >= tail_start:
+        cd = tail[cd_offset - tail_start:cd_offset - tail_start + cd_size]
+    else:
+        cd, _ = http_range(url, cd_offset, cd_offset + cd_size - 1, version)
+
+    entries = {}
+    pos = 0
+    while pos + 46 <= len(cd) and cd[pos:pos + 4] == b'PK\x01\x02':
+        (_, _, _, flags, method, _, _, crc, csize, usize,
+         name_len, extra_len, comment_len, _, _, _, offset) = struct.unpack('<4s6H3I5H2I', cd[pos:pos + 46])
+        raw_name = cd[pos + 46:pos + 46 + name_len]
+        name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437')
+        entries[name] = {'method': method, 'crc': crc, 'csize': csize, 'usize': usize,
+                         'offset': offset, 'name_len': name_len, 'extra_len': extra_len}
+        pos += 46 + name_len + extra_len + comment_len
+    return entries, total, tail, tail_start, version
+
+def fetch_zip_member(url, entry, tail, tail_start, version=None):
+    """Fetches and inflates one member using its central directory entry."""
+    import struct
+    import zlib
+    # The local header repeats the name and may carry a different extra field; over-fetch a little
+    start = entry['offset']
+    end = start + 30 + entry['name_len'] + entry['extra_len'] + entry['csize'] + 1024
+    if start >= tail_start:
+        chunk = tail[start - tail_start:end - tail_start]
+    else:
+        chunk, _ = http_range(url, start, end - 1, version)
+    if chunk[:4] != b'PK\x03\x04':
+        raise RangeNotSupported("bad local file header")
+    name_len, extra_len = struct.unpack('<2H', chunk[26:30])
+    data_start = 30 + name_len + extra_len
+    data = chunk[data_start:data_start + entry['csize']]
+    if len(data) < entry['csize']:
+        more, _ = http_range(url, start + data_start + len(data), start + data_start + entry['csize'] - 1, version)
+        data += more
+
+    if entry['method'] == 0:
+        content = data
+    elif entry['method'] == 8:
+        try: content = zlib.decompress(data, -15)
+        except zlib.error: raise RangeNotSupported("member data is corrupt")
+    else:
+        raise RangeNotSupported(f"unsupported compression method {entry['method']}")
+    # Most likely the archive was regenerated mid-read; a full download gets one consistent copy
+    if zlib.crc32(content) != entry['crc'] or len(content) != entry['usize']:
+        raise RangeNotSupported(f"CRC mismatch extracting member from {url}")
+    return content
+
+def fetch_zip_members(url, paths):
+    """Returns {path: bytes} for the requested members, fetching only their byte ranges.
+
+    Raises RangeNotSupported when that isn't possible or wouldn't save much, so the caller
+    can fall back to downloading the whole archive.
+    """
+    entries, total, tail, tail_start, version = read_central_directory(url)
+    missing = [p for p in paths if p not in entries]
+    if missing:
+        raise KeyError(f"There is no item named '{missing[0]}' in the archive")
+    if sum(entries[p]['csize'] for p in paths) > total // 2:
+        raise RangeNotSupported("requested members make up most of the archive")
+    return {p: fetch_zip_member(url, entries[p], tail, tail_start, version) for p in paths}
+
+def staging_path(name):
+    return os.path.join(CUSTOM_PLUGIN_DIR, f".{name}.py.pwnstore-tmp")
+
+def installed_sha256(name):
+    file_path = os.path.join(CUSTOM_PLUGIN_DIR, f"{name}.py")
+    return file_sha256(file_path) if os.path.exists(file_path) else None
+
+class ChecksumMismatch(Exception):
+    """A download doesn't match the SHA-256 the registry recorded for it."""
+
+def write_staged(plugin, chunks):
+    """Streams chunks into the plugin's staging file, hashing as it goes, and rejects
+    content that doesn't match the registry's SHA-256 (when the registry has one)."""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(staging_path(plugin['name']), "wb") as dest:
+        for chunk in chunks:
+            digest.update(chunk)
+            dest.write(chunk)
+    check_checksum(plugin, digest.hexdigest())
+
+def check_checksum(plugin, digest):
+    expected = plugin.get('sha256')
+    if expected and digest != expected:
+        raise ChecksumMismatch(f"{plugin['name']} does not match the registry checksum "
+                               f"(the plugin changed upstream since the last registry build, or the download was corrupted)")
+
+def stage_source(url, plugins, progress=None):
+    """Downloads one source once and writes every requested plugin from it to a staging file.
+    Archive members are fetched with HTTP Range when the server allows it."""
+    if plugins[0].get('origin_type') != 'zip':
+        path = staging_path(plugins[0]['name'])
+        with open(path, "wb") as f:
+            download(url, f, progress)
+        with timings.phase("verify"):
+            check_checksum(plugins[0], file_sha256(path))
+        return
 
     try:
+        with timings.phase("extract.range"):
+            members = fetch_zip_members(url, [p['path_inside_zip'] for p in plugins])
+        for plugin in plugins:
+            print(f"[*] Extracted {plugin['path_inside_zip']} (partial download)")
+            write_staged(plugin, [members[plugin['path_inside_zip']]])
+        return
+    except RangeNotSupported:
+        pass
+
+    import tempfile
+    import zipfile
+    with tempfile.TemporaryFile() as archive:
+        download(url, archive, progress)
+        with timings.phase("extract.archive"):
+            z = zipfile.ZipFile(archive)
+            for plugin in plugins:
+                target_path = plugin['path_inside_zip']
+                print(f"[*] Extracting {target_path}...")
+                with z.open(target_path) as source:
+                    write_staged(plugin, iter(lambda: source.read(DOWNLOAD_CHUNK), b""))
+
+def install_plugins(names, registry=None):
+    """Installs several plugins as one transaction: one registry lookup, one download per
+    source (sources fetched in parallel), and nothing replaced unless every download worked.
+    Files already matching the registry checksum are not downloaded again.
+    Returns the list of installed names."""
+    import contextvars
+    from concurrent.futures import ThreadPoolExecutor
+
+    if registry is None:
+        registry = fetch_registry()
+    index = {p['name']: p for p in registry}
+
+    targets = []
+    for name in dict.fromkeys(names):
+        if not is_safe_name(name): return []
+        plugin_data = index.get(name)
+        if not plugin_data:
+            print(f"{RED}[!] Plugin '{name}' not found in registry.{RESET}")
+            return []
         if plugin_data.get('origin_type') == 'zip':
-            print(f"[*] Downloading repository archive...")
-            r = requests.get(plugin_data['download_url'], timeout=30)
-            z = zipfile.ZipFile(io.BytesIO(r.content))
             target_path = plugin_data['path_inside_zip']
-            if ".." in target_path or target_path.startswith("/"): return
-            print(f"[*] Extracting {target_path}...")
-            if not os.path.exists(CUSTOM_PLUGIN_DIR): os.makedirs(CUSTOM_PLUGIN_DIR)
-            with z.open(target_path) as source, open(final_file_path, "wb") as dest:
-                shutil.copyfileobj(source, dest)
-        else:
-            print(f"[*] Downloading file...")
-            r = requests.get(plugin_data['download_url'], timeout=30)
-            if not os.path.exists(CUSTOM_PLUGIN_DIR): os.makedirs(CUSTOM_PLUGIN_DIR)
-            with open(final_file_path, "wb") as f: f.write(r.content)
+            if ".." in target_path or target_path.startswith("/"): return []
+        targets.append(plugin_data)
+
+    # Installed files already identical to the registry copy need no download
+    with timings.phase("install.check"):
+        current = [p for p in targets if p.get('sha256') and p['sha256'] == installed_sha256(p['name'])]
+    targets = [p for p in targets if p not in current]
+
+    # A single-file source only ever carries its one plugin; archives are shared
+    groups = {}
+    for plugin_data in targets:
+        key = plugin_data['download_url'] if plugin_data.get('origin_type') == 'zip' else plugin_data['name']
+        groups.setdefault(key, []).append(plugin_data)
 
+    for plugin_data in current:
+        print(f"[=] {CYAN}{plugin_data['name']}{RESET} is already up to date.")
+    for plugin_data in targets:
+        print(f"[*] Installing {CYAN}{plugin_data['name']}{RESET} by {plugin_data['author']}...")
+    archives = sum(1 for g in groups.values() if g[0].get('origin_type') == 'zip')
+    if groups: print(f"[*] Downloading {len(groups)} source(s) ({archives} repository archive(s))...")
+
+    if not os.path.exists(CUSTOM_PLUGIN_DIR): os.makedirs(CUSTOM_PLUGIN_DIR)
+    progress = DownloadProgress()
+    try:
+        if groups:
+            with timings.phase("install.download"), ThreadPoolExecutor(max_workers=min(4, len(groups))) as pool:
+                # Each worker runs in a copy of this context (output capture under `serve`)
+                futures = [pool.submit(contextvars.copy_context().run, stage_source, g[0]['download_url'], g, progress)
+                           for g in groups.values()]
+                for future in futures: future.result()
+        progress.finish()
+    except Exception as e:
+        progress.finish()
+        print(f"{RED}[!] Installation failed: {e}{RESET}")
+        for plugin_data in targets:
+            try: os.remove(staging_path(plugin_data['name']))
+            except OSError: pass
+        return []
+
+    installed = []
+    config = ConfigTransaction()
+    for plugin_data in current:
+        record_install(plugin_data, os.path.join(CUSTOM_PLUGIN_DIR, f"{plugin_data['name']}.py"))
+        installed.append(plugin_data['name'])
+        config.enable(plugin_data['name'])
+    for plugin_data in targets:
+        target_name = plugin_data['name']
+        final_file_path = os.path.join(CUSTOM_PLUGIN_DIR, f"{target_name}.py")
+        with timings.phase("install.replace"):
+            os.replace(staging_path(target_name), final_file_path)
+            record_install(plugin_data, final_file_path)
+        installed.append(target_name)
         print(f"{GREEN}[+] Successfully installed to {final_file_path}{RESET}")
-        update_config(target_name, enable=True)
+        config.enable(target_name)
         
-        # Smart Config Scan
-        params = scan_for_config_params(final_file_path, target_name)
+        # Smart Config Scan: precomputed by the builder, older registries need a local scan
+        params = plugin_data.get('config_params')
+        if params is None:
+            with timings.phase("install.scan_params"):
+                params = scan_for_config_params(final_file_path, target_name)
         if params:
             print(f"\n{YELLOW}[!] CONFIGURATION REQUIRED:{RESET}")
             print(f"This plugin references the following options. Add them to config.toml:")
             for p in params: print(f"  main.plugins.{target_name}.{p} = \"...\"")
-            
-    except Exception as e: print(f"{RED}[!] Installation failed: {e}{RESET}")
+    save_manifest()
+    commit_config(config, enabled=installed)
+    return installed
+
+def install_plugin(args):
+    check_sudo()
+    install_plugins(args.name)
 
 def uninstall_plugin(args):
     check_sudo()
@@ -348,66 +1269,520 @@ def uninstall_plugin(args):
     target_name = args.name
     file_path = os.path.join(CUSTOM_PLUGIN_DIR, f"{target_name}.py")
     if not os.path.exists(file_path):
+        # Deleted by hand: forget it, or upgrade would bring it back
+        if load_manifest().pop(target_name, None): save_manifest()
         print(f"{RED}[!] Plugin {target_name} is not installed.{RESET}")
         return
     print(f"[*] Removing {file_path}...")
     try:
         os.remove(file_path)
+        if get_installed_plugins().pop(target_name, None): save_manifest()
         print(f"{GREEN}[+] File removed.{RESET}")
         update_config(target_name, enable=False)
     except Exception as e: print(f"{RED}[!] Error: {e}{RESET}")
 
-def update_config(plugin_name, enable=True):
-    """Updates config.toml with a blank line for new entries."""
+def verify_plugins(args):
+    """Checks installed files against the hashes recorded at install time."""
+    installed = load_manifest()  # unsynced, so deleted and hand-copied files still show
+    on_disk = set()
+    if os.path.exists(CUSTOM_PLUGIN_DIR):
+        on_disk = {f[:-3] for f in os.listdir(CUSTOM_PLUGIN_DIR) if f.endswith(".py")}
+
+    print(f"{'NAME':<25} | {'VERSION':<10} | {'SOURCE':<6} | {'STATE'}")
+    print("-" * 65)
+    problems = 0
+    for name in sorted(set(installed) | on_disk):
+        entry = installed.get(name)
+        file_path = os.path.join(CUSTOM_PLUGIN_DIR, f"{name}.py")
+        if not entry:
+            state = f"{YELLOW}UNTRACKED{RESET}"
+        elif name not in on_disk:
+            state = f"{RED}MISSING{RESET}"
+        elif file_sha256(file_path) != entry['sha256']:
+            state = f"{YELLOW}MODIFIED{RESET}"
+        else:
+            state = f"{GREEN}OK{RESET}"
+        if not state.startswith(GREEN): problems += 1
+        version = entry['version'] if entry else "?"
+        source = entry['source'] if entry else "-"
+        print(f"{name[:24]:<25} | {version[:10]:<10} | {source:<6} | {state}")
+    print("-" * 65)
+    if problems:
+        print(f"{YELLOW}[!] {problems} plugin(s) differ from the manifest. Reinstall to repair.{RESET}")
+        sys.exit(1)
+    print(f"{GREEN}[+] All {len(installed)} plugins match the manifest.{RESET}")
+
+def toml_value(value):
+    if isinstance(value, bool): return 'true' if value else 'false'
+    if isinstance(value, (int, float)): return repr(value)
+    if isinstance(value, (list, tuple)): return "[" + ", ".join(toml_value(v) for v in value) + "]"
+    return json.dumps(str(value))  # a JSON string is a valid TOML basic string
+
+def split_toml_comment(text):
+    """Splits what follows '=' into (value, trailing comment); a '#' inside a string isn't a comment."""
+    quote, i = None, 0
+    while i < len(text):
+        c = text[i]
+        if quote:
+            if c == '\\' and quote == '"': i += 1
+            elif c == quote: quote = None
+        elif c in '"\'': quote = c
+        elif c == '#': break
+        i += 1
+    value = text[:i].rstrip()
+    return value, text[len(value):]
+
+def canonical_toml_value(text):
+    """text as toml_value() would write it, or None for values it doesn't produce."""
+    if re.match(r"'[^'\n]*'$", text): return toml_value(text[1:-1])
+    try: return toml_value(json.loads(text))
+    except ValueError: return None
+
+def toml_error(text):
+    """Why text isn't valid TOML, or None. Also None without tomllib (Python < 3.11)."""
     try:
-        with open(CONFIG_FILE, "r") as f: lines = f.readlines()
-        new_lines = []
-        found = False
-        config_key = f"main.plugins.{plugin_name}.enabled"
-        
+        import tomllib
+    except ImportError:
+        return None
+    try:
+        tomllib.loads(text)
+    except tomllib.TOMLDecodeError as e:
+        return str(e)
+    return None
+
+class ConfigTransaction:
+    """Collects config.toml edits for any number of plugins and applies them in one pass.
+
+    Keys are full dotted keys (main.plugins.<name>.<option>). Every active line assigning
+    a key is rewritten, keeping its trailing comment and line ending; commented-out lines
+    are left alone. Keys inside [table] sections are matched by their full path. A missing
+    key goes at the end of the deepest table its path starts with ([main] gets
+    plugins.<name>.enabled), or at the top level, before the first table, when there is
+    none. The file is replaced atomically, and left untouched when every key already has
+    the wanted value.
+    """
+    def __init__(self, path=None):
+        self.path = path or CONFIG_FILE
+        self.edits = {}
+
+    def set(self, key, value, add_missing=True):
+        self.edits[key] = (toml_value(value), add_missing)
+
+    def enable(self, plugin_name):
+        self.set(f"main.plugins.{plugin_name}.enabled", True)
+
+    def disable(self, plugin_name):
+        # Nothing to disable if the plugin was never configured
+        self.set(f"main.plugins.{plugin_name}.enabled", False, add_missing=False)
+
+    def apply(self, lines):
+        """The edited copy of lines (as from readlines() with newline='')."""
+        newline = "\r\n" if lines and lines[0].endswith("\r\n") else "\n"
+        new_lines, seen, table, first_table = [], set(), "", None
+        table_end = {}  # table prefix -> position just past its last non-blank line
         for line in lines:
-            if config_key in line:
-                found = True
-                new_lines.append(f"{config_key} = {'true' if enable else 'false'}\n")
+            header = re.match(r'\s*\[([^\[\]]+)\]\s*(#.*)?$', line)
+            if header:
+                table = re.sub(r'\s*\.\s*', '.', header.group(1).strip()) + "."
+                if first_table is None: first_table = len(new_lines)
+            elif re.match(r'\s*\[\[', line):
+                table = None  # keys inside arrays of tables are never ours
+            match = table is not None and not header and re.match(r'(\s*)([A-Za-z0-9_.-]+)\s*=\s*(.*?)(\r?\n)?$', line)
+            key = match and table + match.group(2)
+            if key in self.edits:
+                seen.add(key)
+                value, comment = split_toml_comment(match.group(3))
+                wanted = self.edits[key][0]
+                if canonical_toml_value(value) == wanted:
+                    new_lines.append(line)
+                else:
+                    new_lines.append(f"{match.group(1)}{match.group(2)} = {wanted}{comment}{match.group(4) or ''}")
             else:
                 new_lines.append(line)
-        
-        if not found and enable:
-            if new_lines and not new_lines[-1].endswith('\n'): new_lines[-1] += '\n'
-            new_lines.append(f"\n{config_key} = true\n")
+            if table and line.strip(): table_end[table] = len(new_lines)
 
-        with open(CONFIG_FILE, "w") as f: f.writelines(new_lines)
-        state = "Enabled" if enable else "Disabled"
-        print(f"{GREEN}[+] Plugin {state} in config.toml. Restart required.{RESET}")
+        # A top-level dotted key next to a [main] header declares main twice, so
+        # missing keys go inside the deepest table they belong to
+        top, inserts = [], {}
+        for key, (value, add_missing) in self.edits.items():
+            if not add_missing or key in seen: continue
+            parent = max((t for t in table_end if key.startswith(t)), key=len, default="")
+            if parent:
+                inserts.setdefault(table_end[parent], []).append(f"{key[len(parent):]} = {value}{newline}")
+            else:
+                top.append(f"{key} = {value}{newline}")
+        for position in sorted(inserts, reverse=True):
+            if not new_lines[position - 1].endswith('\n'): new_lines[position - 1] += newline
+            new_lines[position:position] = inserts[position]
+        if top:
+            if first_table is None:
+                if new_lines and not new_lines[-1].endswith('\n'): new_lines[-1] += newline
+                new_lines += [newline] + top
+            else:
+                new_lines[first_table:first_table] = top + [newline]
+        return new_lines
+
+    def commit(self):
+        """Writes the edits. Returns True if config.toml changed. Raises ValueError, without
+        writing, if the edited file would no longer parse."""
+        if not self.edits: return False
+        with timings.phase("config.read"):
+            with open(self.path, "r", newline="") as f: lines = f.readlines()
+            new_lines = self.apply(lines)
+        if new_lines == lines: return False
+        text = "".join(new_lines)
+        with timings.phase("config.check"):
+            # Never be the edit that breaks the config; one that already failed is no worse
+            error = toml_error(text)
+            if error and not toml_error("".join(lines)):
+                raise ValueError(f"the edited config.toml would not parse ({error}); left it unchanged")
+        with timings.phase("config.write"):
+            write_file_atomic(self.path, text)
+        return True
+
+def commit_config(config, enabled=(), disabled=()):
+    """Commits a ConfigTransaction and reports the outcome; never raises."""
+    try:
+        if not config.commit():
+            print("[*] config.toml already up to date.")
+            return
+        for state, names in (("Enabled", enabled), ("Disabled", disabled)):
+            if names: print(f"{GREEN}[+] {state} {', '.join(names)} in config.toml. Restart required.{RESET}")
     except Exception as e: print(f"{YELLOW}[!] Config update failed: {e}{RESET}")
 
+def update_config(plugin_name, enable=True):
+    """Enables or disables a single plugin in config.toml."""
+    config = ConfigTransaction()
+    if enable: config.enable(plugin_name)
+    else: config.disable(plugin_name)
+    commit_config(config, enabled=[plugin_name] if enable else (), disabled=() if enable else [plugin_name])
+
+# --- SERVICE MODE (pwnstore serve) ---
+SERVE_PORT = 8766
+SERVE_REVALIDATE = 600  # seconds between background registry revalidations
+SERVE_MAX_BODY = 64 * 1024
+ANSI_RE = re.compile(r'\x1b\[[0-9;]*m')
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class CapturedOutput:
+    """Stands in for sys.stdout so one request can collect what the shared CLI code
+    prints (for an API response) while everything else prints as usual. The capture
+    follows the context, so workers started with contextvars.copy_context() share it."""
+
+    def __init__(self, stream):
+        import contextvars
+        self.stream = stream
+        self.chunks = contextvars.ContextVar('pwnstore_output', default=None)
+
+    def capture(self):
+        self.chunks.set([])
+
+    def release(self):
+        """Stops capturing; returns the captured lines without colours or blank lines."""
+        text = ANSI_RE.sub('', "".join(self.chunks.get()))
+        self.chunks.set(None)
+        return [line.strip() for line in re.split(r'[\r\n]+', text) if line.strip()]
+
+    def write(self, text):
+        chunks = self.chunks.get()
+        if chunks is None: return self.stream.write(text)
+        chunks.append(text)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def isatty(self):
+        # No progress redraws in captured output
+        return self.chunks.get() is None and self.stream.isatty()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+class StoreService:
+    """Registry, search index and install state held in memory for `pwnstore serve`.
+
+    Reads answer from the current snapshot; refresh() builds a new one (in a worker
+    thread when called from the server) and swaps it in. Installs and upgrades go
+    through install_plugins(), the CLI's own code path, one at a time.
+    """
+
+    def __init__(self):
+        import threading
+        self.snapshot = None  # (registry, {name: record}, search index, loaded at)
+        self.refresh_lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.manifest_lock = threading.Lock()
+        self.manifest_mtime = None
+        if not isinstance(sys.stdout, CapturedOutput): sys.stdout = CapturedOutput(sys.stdout)
+        self.output = sys.stdout
+
+    def refresh(self, force=True):
+        """Revalidates the registry (force skips the cache TTL). Raises StoreError."""
+        with self.refresh_lock:
+            registry = load_registry(force)
+            current = self.snapshot
+            if current and current[0] == registry:
+                self.snapshot = current[:3] + (time.time(),)
+                return
+            index = load_search_index(registry)
+            self.snapshot = (registry, {p['name']: p for p in registry}, index, time.time())
+
+    def installed(self):
+        """A copy of the install manifest, re-read when another process (the CLI) changed it
+        and synced with the plugin directory."""
+        global _manifest
+        with self.manifest_lock:
+            # Never while an install is filling in the manifest
+            if not self.write_lock.acquire(blocking=False):
+                return dict(load_manifest())
+            try:
+                try: mtime = os.stat(MANIFEST_FILE).st_mtime_ns
+                except OSError: mtime = None
+                if mtime != self.manifest_mtime:
+                    _manifest = None
+                    self.manifest_mtime = mtime
+                return dict(get_installed_plugins())
+            finally:
+                self.write_lock.release()
+
+    def record(self, plugin, installed):
+        return dict(plugin, status=install_state(plugin['name'], installed))
+
+    def health(self):
+        registry, _, _, loaded_at = self.snapshot
+        return {'plugins': len(registry), 'installed': len(self.installed()), 'loaded_at': int(loaded_at)}
+
+    def plugins(self, category=None, status=None):
+        registry, installed = self.snapshot[0], self.installed()
+        records = [self.record(p, installed) for p in registry
+                   if not category or p.get('category', '').lower() == category.lower()]
+        return {'plugins': [r for r in records if not status or r['status'] == status]}
+
+    def search(self, query, category=None, author=None):
+        registry, _, index, _ = self.snapshot
+        installed = self.installed()
+        return {'plugins': [self.record(p, installed) for p in ranked_search(registry, index, query, category, author)]}
+
+    def info(self, name):
+        plugin = self.snapshot[1].get(name)
+        if not plugin: raise ApiError(404, f"Plugin '{name}' not found.")
+        installed = self.installed()
+        return dict(self.record(plugin, installed), installed=installed.get(name))
+
+    def updates(self):
+        with self.write_lock:
+            return {'updates': find_updates(self.snapshot[0])}
+
+    def install(self, names):
+        if not isinstance(names, list) or not names or not all(isinstance(n, str) for n in names):
+            raise ApiError(400, "Expected {\"names\": [\"plugin\", ...]}.")
+        if os.geteuid() != 0:
+            raise ApiError(403, "pwnstore serve must run with sudo to install plugins.")
+        with self.write_lock:
+            self.output.capture()
+            try:
+                installed = install_plugins(names, self.snapshot[0])
+            finally:
+                log = self.output.release()
+        return {'installed': installed, 'ok': len(installed) == len(set(names)), 'log': log}
+
+    def upgrade(self, names=None):
+        if names is not None and (not isinstance(names, list) or not all(isinstance(n, str) for n in names)):
+            raise ApiError(400, "Expected {\"names\": [\"plugin\", ...]} or no names to upgrade everything.")
+        updates = [u for u in self.updates()['updates'] if names is None or u['name'] in names]
+        if not updates:
+            return {'updates': [], 'installed': [], 'ok': True, 'log': []}
+        return dict(self.install([u['name'] for u in updates]), updates=updates)
+
+async def call_api(service, method, path, query, body):
+    import asyncio
+    from urllib.parse import unquote
+    loop = asyncio.get_running_loop()
+    def blocking(func, *args):
+        return loop.run_in_executor(None, func, *args)
+
+    # Every lookup reads install state, which may hash new plugin files and write the manifest
+    if method == 'GET':
+        if path == '/health': return await blocking(service.health)
+        if path == '/plugins': return await blocking(service.plugins, query.get('category'), query.get('status'))
+        if path.startswith('/plugins/'): return await blocking(service.info, unquote(path[len('/plugins/'):]))
+        if path == '/search': return await blocking(service.search, query.get('q', ''), query.get('category'), query.get('author'))
+        if path == '/upgrades': return await blocking(service.updates)
+    elif method == 'POST':
+        if path == '/install': return await blocking(service.install, body.get('names'))
+        if path == '/upgrade': return await blocking(service.upgrade, body.get('names'))
+        if path == '/refresh':
+            await blocking(service.refresh)
+            return await blocking(service.health)
+    raise ApiError(404, f"No such endpoint: {method} {path}")
+
+async def answer(service, method, target, headers, body, allowed_hosts):
+    """(status, payload) for one request."""
+    from urllib.parse import urlsplit, parse_qsl
+    # Only local clients: refuse other Host names (DNS rebinding), and require a JSON
+    # content type on writes, which a web page can't send cross-origin without a preflight
+    host = headers.get('host', '')
+    if not host.endswith(']'): host = host.rsplit(':', 1)[0]
+    if host not in allowed_hosts:
+        return 403, {'error': "Forbidden host."}
+    if method == 'POST' and not headers.get('content-type', '').startswith('application/json'):
+        return 415, {'error': "POST bodies must be application/json."}
+    url = urlsplit(target)
+    try:
+        payload = json.loads(body) if body else {}
+    except ValueError:
+        return 400, {'error': "Malformed JSON body."}
+    try:
+        if not isinstance(payload, dict): raise ApiError(400, "Expected a JSON object.")
+        return 200, await call_api(service, method, url.path.rstrip('/') or '/', dict(parse_qsl(url.query)), payload)
+    except ApiError as e:
+        return e.status, {'error': str(e)}
+    except StoreError as e:
+        return 503, {'error': ANSI_RE.sub('', str(e))}
+    except Exception as e:
+        return 500, {'error': f"{type(e).__name__}: {e}"}
+
+async def serve_connection(service, reader, writer, allowed_hosts):
+    """Minimal HTTP/1.1 with keep-alive: enough for local scripts and the web UI."""
+    import asyncio
+    from http import HTTPStatus
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line: break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''): break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            parts = request_line.decode('latin-1').split()
+            length = headers.get('content-length', '0')
+            if len(parts) != 3 or not length.isdigit() or int(length) > SERVE_MAX_BODY:
+                status, payload, keep_alive = 400, {'error': "Bad request."}, False
+            else:
+                method, target, version = parts
+                body = await reader.readexactly(int(length)) if int(length) else b''
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                status, payload = await answer(service, method, target, headers, body, allowed_hosts)
+            data = json.dumps(payload).encode()
+            writer.write(f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                         f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                         f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+            await writer.drain()
+            if not keep_alive: break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def run_server(service, host, port, revalidate, ready=None):
+    """Serves the API until cancelled, revalidating the registry every `revalidate` seconds.
+    ready(port) is called once the socket is listening."""
+    import asyncio
+    allowed_hosts = {'localhost', '127.0.0.1', '[::1]', host}
+    server = await asyncio.start_server(lambda r, w: serve_connection(service, r, w, allowed_hosts), host, port)
+    if ready: ready(server.sockets[0].getsockname()[1])
+
+    async def revalidate_forever():
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(revalidate)
+            try: await loop.run_in_executor(None, service.refresh)
+            except StoreError as e: print(f"{YELLOW}[!] Registry revalidation failed: {e}{RESET}")
+
+    revalidation = asyncio.ensure_future(revalidate_forever()) if revalidate else None
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if revalidation: revalidation.cancel()
+
+def serve(args):
+    """`pwnstore serve`: the CLI's commands as a JSON API on localhost."""
+    import asyncio
+    service = StoreService()
+    print(f"[*] Loading registry...")
+    try:
+        service.refresh(force=False)
+    except StoreError as e:
+        print(f"{RED}[!] {e}{RESET}")
+        sys.exit(1)
+
+    def ready(port):
+        print(f"{GREEN}[+] Serving {len(service.snapshot[0])} plugins on http://{args.host}:{port}/ "
+              f"(revalidating every {args.revalidate}s). Ctrl+C to stop.{RESET}")
+    try:
+        asyncio.run(run_server(service, args.host, args.port, args.revalidate, ready))
+    except KeyboardInterrupt:
+        print("\n[*] Stopped.")
+
+def add_global_flags(parser, subcommand=False):
+    """Flags accepted both before and after the subcommand."""
+    # On subparsers, SUPPRESS keeps an omitted flag from overwriting the main parser's value
+    default = argparse.SUPPRESS if subcommand else False
+    parser.add_argument('--offline', action='store_true', default=default, help='Use the cached registry only, never the network')
+    parser.add_argument('--refresh', action='store_true', default=default, help='Revalidate the cached registry now, ignoring its TTL')
+    parser.add_argument('--timings', action='store_true', default=default, help='Print time spent per phase (network, downloads, config...) on exit')
+    parser.add_argument('--timings-json', metavar='FILE', default=argparse.SUPPRESS if subcommand else None,
+                        help=f"Write the per-phase timings as JSON to FILE ('-' for stdout); or set {TIMINGS_ENV}=FILE")
+
 def main():
-    banner()
-    parser = argparse.ArgumentParser(description="Pwnagotchi Plugin Manager")
-    subparsers = parser.add_subparsers()
-    parser_list = subparsers.add_parser('list', help='List all available plugins')
+    global OFFLINE, REFRESH
+    parser = argparse.ArgumentParser(description="Pwnagotchi Plugin Manager",
+                                     epilog="Timing phases overlap: parallel downloads run side by side and net.* "
+                                            "(DNS, TCP/TLS connect) is part of whichever phase made the request.")
+    add_global_flags(parser)
+    subparsers = parser.add_subparsers(dest='command')
+    common = argparse.ArgumentParser(add_help=False)
+    add_global_flags(common, subcommand=True)
+    parser_list = subparsers.add_parser('list', help='List all available plugins', parents=[common])
     parser_list.set_defaults(func=list_plugins)
-    parser_sources = subparsers.add_parser('sources', help='List repository sources')
+    parser_sources = subparsers.add_parser('sources', help='List repository sources', parents=[common])
     parser_sources.set_defaults(func=list_sources)
-    parser_search = subparsers.add_parser('search', help='Search for a plugin')
-    parser_search.add_argument('query', type=str, help='Search term')
+    parser_search = subparsers.add_parser('search', help='Search for a plugin', parents=[common])
+    parser_search.add_argument('query', type=str, nargs='?', default='', help='Search term (typos are tolerated)')
+    parser_search.add_argument('--category', help='Only plugins in this category (e.g. GPS, Display)')
+    parser_search.add_argument('--author', help='Only plugins whose author contains this text')
     parser_search.set_defaults(func=search_plugins)
-    parser_info = subparsers.add_parser('info', help='Show details about a plugin')
+    parser_info = subparsers.add_parser('info', help='Show details about a plugin', parents=[common])
     parser_info.add_argument('name', type=str, help='Name of the plugin')
     parser_info.set_defaults(func=show_info)
-    parser_install = subparsers.add_parser('install', help='Install a plugin')
-    parser_install.add_argument('name', type=str, help='Name of the plugin')
+    parser_install = subparsers.add_parser('install', help='Install one or more plugins', parents=[common])
+    parser_install.add_argument('name', type=str, nargs='+', help='Name of the plugin(s)')
     parser_install.set_defaults(func=install_plugin)
-    parser_uninstall = subparsers.add_parser('uninstall', help='Uninstall a plugin')
+    parser_uninstall = subparsers.add_parser('uninstall', help='Uninstall a plugin', parents=[common])
     parser_uninstall.add_argument('name', type=str, help='Name of the plugin')
     parser_uninstall.set_defaults(func=uninstall_plugin)
-    parser_update = subparsers.add_parser('update', help='Update PwnStore tool to latest version')
+    parser_update = subparsers.add_parser('update', help='Update PwnStore tool to latest version', parents=[common])
     parser_update.set_defaults(func=update_self)
-    parser_upgrade = subparsers.add_parser('upgrade', help='Check for and install plugin updates')
+    parser_upgrade = subparsers.add_parser('upgrade', help='Check for and install plugin updates', parents=[common])
     parser_upgrade.set_defaults(func=upgrade_plugins)
+    parser_verify = subparsers.add_parser('verify', help='Check installed plugins against the install manifest', parents=[common])
+    parser_verify.set_defaults(func=verify_plugins)
+    parser_serve = subparsers.add_parser('serve', help='Serve list/search/info/install/upgrade as a local JSON API', parents=[common])
+    parser_serve.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: localhost only)')
+    parser_serve.add_argument('--port', type=int, default=SERVE_PORT, help=f'Port to listen on (default: {SERVE_PORT})')
+    parser_serve.add_argument('--revalidate', type=int, default=SERVE_REVALIDATE, metavar='SECONDS',
+                              help=f'Seconds between background registry checks, 0 to disable (default: {SERVE_REVALIDATE})')
+    parser_serve.set_defaults(func=serve)
     args = parser.parse_args()
-    if hasattr(args, 'func'): args.func(args)
-    else: parser.print_help()
+    OFFLINE, REFRESH = args.offline, args.refresh
+    env = os.environ.get(TIMINGS_ENV, "")
+    timings_json = args.timings_json or (env if env not in ("", "0", "1") else None)
+    if args.timings or timings_json or env == "1": timings.enable()
+    # The banner is for people; scripts driving pwnstore get clean output
+    if sys.stdout.isatty() or not hasattr(args, 'func'): banner()
+    try:
+        if hasattr(args, 'func'): args.func(args)
+        else: parser.print_help()
+    finally:
+        if timings.enabled: finish_timings(args.command, timings_json)
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file